@@ -1,64 +1,319 @@
 import requests
-from PIL import Image, ImageEnhance
+from PIL import Image
+import numpy as np
+import cv2
 import io
+import logging
 import time
 import datetime
-from typing import Optional
+import threading
+import queue
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    # libjpeg-turbo with SIMD IDCT/Huffman; noticeably faster than PIL's decoder
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _tj = TurboJPEG()
+except Exception as e:
+    logger.warning("TurboJPEG unavailable, falling back to PIL for JPEG coding: %s", e)
+    _tj = None
 
 # CAPTURE_URL = "http://10.42.0.114/capture" # Use the capture endpoint
 CAPTURE_URL = "http://192.168.137.58/capture"
 _last_frame: Optional[Image.Image] = None
 _last_frame_time: float = 0
 
+# Seconds between background polls of the camera, and before the first retry after a
+# failed fetch; the retry delay doubles with each further failure, up to MAX_RETRY_INTERVAL
+POLL_INTERVAL = 0.2
+RETRY_INTERVAL = 2.0
+MAX_RETRY_INTERVAL = 30.0
+# Frames older than this many seconds are treated as unavailable
+MAX_FRAME_AGE = 5.0
+# The background grabber stops after this many seconds without anyone asking for a frame
+IDLE_TIMEOUT = 60.0
+_grabber_lock = threading.Lock()
+
+# Keep-alive session so repeated captures reuse one TCP connection to the camera
+_session = requests.Session()
+# Per-thread receive buffer, grown as needed and reused across frames
+_recv = threading.local()
+# Idle encode buffers, shared by all threads and bounded so bursts don't pin memory
+_bytesio_pool: "queue.LifoQueue[io.BytesIO]" = queue.LifoQueue(maxsize=32)
+
+# Enhancement factors applied to every camera frame
+SHARPNESS = 2.0
+CONTRAST = 1.5
+BRIGHTNESS = 1.2
+COLOR = 1.3
+
+# PIL's SMOOTH kernel; ImageEnhance.Sharpness blends each frame against it
+_SMOOTH = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13.0
+_IDENTITY = np.zeros((3, 3), dtype=np.float32)
+_IDENTITY[1, 1] = 1.0
+_SHARPEN_KERNEL = SHARPNESS * _IDENTITY + (1.0 - SHARPNESS) * _SMOOTH
+
+
+def _decode_jpeg(data) -> np.ndarray:
+    """Decode JPEG bytes to an RGB uint8 array, raising on a corrupt payload."""
+    if _tj is not None:
+        return _tj.decode(data, pixel_format=TJPF_RGB)
+    img = Image.open(io.BytesIO(data))
+    # Decode now so a truncated or corrupt JPEG raises here
+    img.load()
+    return np.asarray(img.convert("RGB"))
+
+
+def _enhance_frame(rgb: np.ndarray) -> Image.Image:
+    """
+    Apply the sharpness, contrast, brightness and color boosts to a frame.
+
+    Matches chaining the four ImageEnhance passes, but runs on OpenCV's
+    SIMD kernels: one filter2D for sharpness, one lookup table for the
+    contrast and brightness stages together, and one addWeighted for color.
+    """
+    rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+
+    # Sharpness: PIL leaves the one-pixel border untouched
+    out = cv2.filter2D(rgb, -1, _SHARPEN_KERNEL, borderType=cv2.BORDER_REPLICATE)
+    out[0], out[-1], out[:, 0], out[:, -1] = rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]
+
+    # Contrast around the mean grayscale level, then brightness, as one per-value table
+    mean = int(cv2.mean(cv2.cvtColor(out, cv2.COLOR_RGB2GRAY))[0] + 0.5)
+    levels = np.arange(256, dtype=np.float32)
+    levels = np.clip(mean + CONTRAST * (levels - mean), 0, 255)
+    lut = np.clip(levels * BRIGHTNESS + 0.5, 0, 255).astype(np.uint8)
+    out = cv2.LUT(out, lut)
+
+    # Color: scale each pixel's distance from its grayscale value
+    gray = cv2.cvtColor(cv2.cvtColor(out, cv2.COLOR_RGB2GRAY), cv2.COLOR_GRAY2RGB)
+    out = cv2.addWeighted(out, COLOR, gray, 1.0 - COLOR, 0)
+
+    return Image.fromarray(out, "RGB")
+
+def _read_body(response: requests.Response) -> memoryview:
+    """
+    Read a streamed response body into a reusable buffer.
+
+    The camera always sends Content-Length, so the body is read straight into
+    a preallocated bytearray instead of being accumulated into a new bytes object.
+    """
+    length = response.headers.get("Content-Length")
+    if length is None:
+        return memoryview(response.content)
+
+    length = int(length)
+    buf = getattr(_recv, "buf", None)
+    if buf is None or len(buf) < length:
+        buf = _recv.buf = bytearray(length)
+    view = memoryview(buf)[:length]
+    read = 0
+    while read < length:
+        n = response.raw.readinto(view[read:])
+        if not n:
+            raise IOError(f"Camera response truncated at {read} of {length} bytes")
+        read += n
+    return view
+
+def _fetch_frame(log_level: int = logging.WARNING) -> Optional[Image.Image]:
+    """
+    Fetch and enhance a single frame from the camera.
+
+    Args:
+        log_level (int): Level to log a failed fetch at
+
+    Returns:
+        Optional[Image.Image]: The enhanced frame, or None on failure
+    """
+    try:
+        with _session.get(CAPTURE_URL, timeout=5, stream=True) as response: # Increased timeout to 5 seconds
+            if response.status_code == 200:
+                return _enhance_frame(_decode_jpeg(_read_body(response)))
+            logger.log(log_level, "Camera at %s returned status %d", CAPTURE_URL, response.status_code)
+    except Exception as e:
+        logger.log(log_level, "Failed to get frame from camera at %s: %s", CAPTURE_URL, e)
+    return None
+
+
+class FrameGrabber(threading.Thread):
+    """
+    Background thread that keeps the most recent camera frame in a shared slot.
+
+    It exits on its own once no frame has been asked for in IDLE_TIMEOUT seconds.
+    While the camera is unreachable it backs off exponentially and logs only the
+    first failure as a warning, so a missing camera doesn't flood the log.
+    """
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        super().__init__(name="frame-grabber", daemon=True)
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._frame: Optional[Image.Image] = None
+        self._frame_time: float = 0
+        self._last_used = time.monotonic()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        failures = 0
+        while not self._stop_event.is_set():
+            if time.monotonic() - self._last_used > IDLE_TIMEOUT:
+                logger.debug("No frame requested for %.0f s; stopping the frame grabber", IDLE_TIMEOUT)
+                break
+            frame = _fetch_frame(logging.WARNING if failures == 0 else logging.DEBUG)
+            if frame is None:
+                failures += 1
+                delay = min(RETRY_INTERVAL * 2 ** (failures - 1), MAX_RETRY_INTERVAL)
+            else:
+                if failures:
+                    logger.info("Camera at %s is responding again after %d failed fetches", CAPTURE_URL, failures)
+                failures = 0
+                delay = self.poll_interval
+                with self._lock:
+                    self._frame = frame
+                    self._frame_time = time.monotonic()
+            self._stop_event.wait(delay)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def latest(self) -> Optional[Image.Image]:
+        """Return the newest frame, or None if there is no sufficiently recent one."""
+        with self._lock:
+            self._last_used = time.monotonic()
+            frame, frame_time = self._frame, self._frame_time
+        if frame is None or time.monotonic() - frame_time > MAX_FRAME_AGE:
+            return None
+        return frame
+
+
+_grabber: Optional[FrameGrabber] = None
+
+
+def start_frame_grabber() -> bool:
+    """
+    Start polling the camera in the background, if not already running.
+
+    Returns:
+        bool: True if a grabber was already running, False if one was just started
+    """
+    global _grabber
+    with _grabber_lock:
+        if _grabber is not None and _grabber.is_alive():
+            return True
+        _grabber = FrameGrabber()
+        _grabber.start()
+        return False
+
+
+def stop_frame_grabber():
+    """Stop the background camera poller."""
+    global _grabber
+    with _grabber_lock:
+        grabber, _grabber = _grabber, None
+    if grabber is not None:
+        grabber.stop()
+        grabber.join(timeout=RETRY_INTERVAL + 5)
+
+
 def get_latest_frame() -> Optional[Image.Image]:
     """Get the latest frame from the camera. Returns None if no frame is available."""
     global _last_frame, _last_frame_time
-    
+
+    # The background grabber is started on first use and keeps a fresh frame ready
+    # without blocking the caller; until it has one, fetch this frame directly
+    if start_frame_grabber():
+        grabber = _grabber
+        if grabber is not None:
+            return grabber.latest()
+
     # If we have a recent frame (less than 1 second old), return it
     if _last_frame is not None and time.time() - _last_frame_time < 1.0:
         return _last_frame
-        
+
+    logger.debug("Attempting to fetch image from camera at: %s", CAPTURE_URL)
+    img = _fetch_frame()
+    if img is not None:
+        _last_frame = img
+        _last_frame_time = time.time()
+    return img
+
+def encode_jpeg(image: Image.Image, quality: int = 85) -> bytes:
+    """
+    Encode an image as JPEG bytes for upload.
+
+    Args:
+        image (Image.Image): Image to encode
+        quality (int): JPEG quality (1-100)
+
+    Returns:
+        bytes: The encoded JPEG
+    """
+    if _tj is not None:
+        return _tj.encode(np.asarray(image.convert("RGB")), quality=quality, pixel_format=TJPF_RGB)
+    with rent_bytesio() as buf:
+        image.convert("RGB").save(buf, format="JPEG", quality=quality)
+        return buf.getvalue()
+
+@contextmanager
+def rent_bytesio() -> Iterator[io.BytesIO]:
+    """
+    Borrow an empty BytesIO from the shared pool, returning it when done.
+
+    Yields:
+        io.BytesIO: A cleared buffer; copy anything needed out with getvalue()
+            before the block exits
+    """
     try:
-        print(f"Attempting to fetch image from camera at: {CAPTURE_URL}")
-        # request to remove jitter
-        requests.get(CAPTURE_URL, timeout=5) # Increased timeout to 5 seconds
-        response = requests.get(CAPTURE_URL, timeout=5) # Increased timeout to 5 seconds
-        if response.status_code == 200:
-            print("Successfully fetched image from camera.")
-            img = Image.open(io.BytesIO(response.content))
-            img.verify()
-            img = Image.open(io.BytesIO(response.content))
-
-            # Enhance sharpness
-            img = ImageEnhance.Sharpness(img).enhance(2.0)
-
-            # Enhance contrast
-            img = ImageEnhance.Contrast(img).enhance(1.5)
-
-            # Enhance brightness
-            img = ImageEnhance.Brightness(img).enhance(1.2)
-
-            # Enhance color
-            img = ImageEnhance.Color(img).enhance(1.3)
-
-            _last_frame = img
-            _last_frame_time = time.time()
-            return img
-    except Exception as e:
-        print(f"Warning: Failed to get frame from camera at {CAPTURE_URL}: {e}")
-        return None
+        buf = _bytesio_pool.get_nowait()
+    except queue.Empty:
+        buf = io.BytesIO()
+    buf.seek(0)
+    buf.truncate(0)
+    try:
+        yield buf
+    finally:
+        try:
+            _bytesio_pool.put_nowait(buf)
+        except queue.Full:
+            pass
+
+def sniff_image_mime(data: bytes) -> Optional[str]:
+    """
+    Identify encoded image bytes from their magic number.
+
+    Args:
+        data (bytes): Encoded image
+
+    Returns:
+        Optional[str]: "image/jpeg", "image/png" or "image/webp", the formats Gemini
+            and Cloud Vision both accept as-is, or None for anything else
+    """
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
 
 def save_image(image: Optional[Image.Image], filename: str | None = None):
     """Save an image to disk. If no image is provided, tries to get the latest frame."""
     if image is None:
         image = get_latest_frame()
         if image is None:
-            print("Warning: No image available to save")
+            logger.warning("No image available to save")
             return
             
     if filename is None:
         # Auto-generate a filename with timestamp
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"frame_{timestamp}.jpg"
-    image.save(filename, format="JPEG", quality=95)
-    print(f"Image saved to {filename}")
+    if _tj is not None:
+        with open(filename, "wb") as f:
+            f.write(_tj.encode(np.asarray(image.convert("RGB")), quality=95, pixel_format=TJPF_RGB))
+    else:
+        image.save(filename, format="JPEG", quality=95)
+    logger.info("Image saved to %s", filename)
@@ -0,0 +1,106 @@
+"""
+Natural language date parsing for daily recap queries
+"""
+
+import re
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from dateutil import parser, relativedelta
+
+logger = logging.getLogger(__name__)
+
+def _last_weekday(now: datetime, day_num: int) -> datetime:
+    """Most recent past occurrence of a weekday, a full week back if it is today."""
+    days_since = (now.weekday() - day_num) % 7
+    if days_since == 0:
+        days_since = 7  # Last week's same day
+    return now - timedelta(days=days_since)
+
+# Keyword phrases for parse_natural_language_date, in priority order, each mapped
+# to a handler taking the current time. Plural forms like "yesterdays" are
+# already matched by their singular substring.
+_DAY_KEYWORDS = (
+    (("today", "my day so far", "this day", "current day"), lambda now: now),
+    (("yesterday",), lambda now: now - timedelta(days=1)),
+    (("tomorrow",), lambda now: now + timedelta(days=1)),
+)
+# "X days/weeks/months/years ago" in one pattern; units are checked in this order
+_AGO_RE = re.compile(r'(\d+)\s+(day|week|month|year)s?\s+ago')
+_AGO_UNITS = ("day", "week", "month", "year")
+_WEEKDAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6
+}
+# Every "last ..." phrase, only scanned for when the query contains "last "
+_LAST_KEYWORDS = (
+    ("last week", lambda now: now - timedelta(weeks=1)),
+    ("last month", lambda now: now - relativedelta.relativedelta(months=1)),
+    ("last year", lambda now: now - relativedelta.relativedelta(years=1)),
+) + tuple(
+    (f"last {day_name}", lambda now, day_num=day_num: _last_weekday(now, day_num))
+    for day_name, day_num in _WEEKDAYS.items()
+)
+
+def _ymd(d: datetime) -> str:
+    """Format a date as YYYYMMDD without going through strftime."""
+    return f"{d.year:04d}{d.month:02d}{d.day:02d}"
+
+def parse_natural_language_date(query: str, *, now: Optional[datetime] = None) -> str:
+    """
+    Parse natural language date expressions and return YYYYMMDD format.
+    
+    Examples:
+    - "Recap my day so far" -> today
+    - "Give me a recap of what my day was like yesterday" -> yesterday
+    - "I need to know what I did two weeks ago" -> two weeks ago
+    - "What happened on the 6th of June?" -> June 6th of current year
+    - "What happened last Monday?" -> last Monday
+
+    Relative dates are resolved against now, which defaults to the current
+    time; pass a fixed value for deterministic results.
+    """
+    query_lower = query.lower().strip()
+    if now is None:
+        now = datetime.now()
+    
+    # Handle relative dates
+    for phrases, handler in _DAY_KEYWORDS:
+        for phrase in phrases:
+            if phrase in query_lower:
+                return _ymd(handler(now))
+    
+    # Handle "X days/weeks/months/years ago" with one scan of the query,
+    # keeping the first amount found for each unit
+    amounts = {}
+    for match in _AGO_RE.finditer(query_lower):
+        amounts.setdefault(match.group(2), int(match.group(1)))
+    for unit in _AGO_UNITS:
+        if unit in amounts:
+            if unit == "day":
+                target_date = now - timedelta(days=amounts[unit])
+            elif unit == "week":
+                target_date = now - timedelta(weeks=amounts[unit])
+            elif unit == "month":
+                target_date = now - relativedelta.relativedelta(months=amounts[unit])
+            else:
+                target_date = now - relativedelta.relativedelta(years=amounts[unit])
+            return _ymd(target_date)
+    
+    # Handle "last week", "last month", "last monday", etc.
+    if "last " in query_lower:
+        for phrase, handler in _LAST_KEYWORDS:
+            if phrase in query_lower:
+                return _ymd(handler(now))
+    
+    # Handle absolute dates like "6th of June", "June 6th"
+    try:
+        # Try to parse with dateutil, filling any missing year/month from now
+        parsed_date = parser.parse(query, fuzzy=True, default=now)
+        return _ymd(parsed_date)
+    except:
+        pass
+    
+    # If all else fails, return today's date
+    logger.info("Could not parse date from query: %r, defaulting to today", query)
+    return _ymd(now)
@@ -1,28 +1,117 @@
 # type:ignore
 import io
 import os
-import base64
-from typing import List, Dict, Optional
-from fastapi import FastAPI, HTTPException
+import asyncio
+import re
+import bisect
+import concurrent.futures
+import hashlib
+from collections import OrderedDict
+import queue
+import logging
+import logging.handlers
+try:
+    # SIMD (SSSE3/AVX2/NEON) decoder; several times faster on multi-MB image payloads
+    import pybase64 as base64
+except ImportError:
+    import base64
+try:
+    # Non-cryptographic hash, an order of magnitude faster than hashlib on multi-MB uploads
+    import xxhash
+except ImportError:
+    xxhash = None
+try:
+    # C JSON parser; the base64 image payloads make request bodies several MB
+    import orjson
+except ImportError:
+    orjson = None
+from contextlib import asynccontextmanager
+from typing import List, Dict, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File
+from fastapi.routing import APIRoute
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from google.genai import types
-from camera_service import get_latest_frame
+from camera_service import get_latest_frame, stop_frame_grabber, encode_jpeg, sniff_image_mime
 from face_detection import FaceRecognitionClass
 from ocr_service import OCRService
 import threading
-from google import genai
-from scene_service import SceneService, strip_markdown
+from scene_service import SceneService, strip_markdown, get_gemini_client
 from PIL import Image
-from datetime import datetime, timedelta
-from dateutil import parser, relativedelta
+from datetime import datetime
+from date_parsing import parse_natural_language_date
 
 # Load environment variables
 load_dotenv()
 
+# Largest decoded image size accepted. This is PIL's process-wide decompression-bomb
+# limit, so it also applies to every image opened by the OCR and scene services
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """
+    Send all log records through a queue to a single console writer thread,
+    so request threads never block on stdout.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener, to stop on shutdown
+    """
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, console)
+
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    listener.start()
+    return listener
+
+# Configured before the services below so their startup messages are captured too
+log_listener = configure_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services with the API and stop them on shutdown."""
+    # The camera frame grabber starts on the first frame request instead
+    if face_recognition is not None:
+        face_recognition.warm_up()
+    yield
+    stop_frame_grabber()
+    if scene_service is not None:
+        # Don't drop screenshots still waiting to be written
+        scene_service.wait_for_saves()
+    _IO_POOL.shutdown(wait=False, cancel_futures=True)
+    log_listener.stop()
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson instead of the stdlib json module."""
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI's 422 handling still applies
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Route that hands its endpoint an ORJSONRequest for body parsing."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request):
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
 # Initialize FastAPI app
-app = FastAPI(title="Smart Glasses API")
+app = FastAPI(title="Smart Glasses API", lifespan=lifespan)
+if orjson is not None:
+    # Must be set before any endpoint is declared
+    app.router.route_class = ORJSONRoute
 
 # Add CORS middleware
 app.add_middleware(
@@ -37,27 +126,37 @@ app.add_middleware(
 try:
     face_recognition = FaceRecognitionClass()
 except Exception as e:
-    print(f"Warning: Face recognition service failed to initialize: {e}")
+    logger.warning("Face recognition service failed to initialize: %s", e)
     face_recognition = None
 
 try:
     ocr_service = OCRService()
 except Exception as e:
-    print(f"Warning: OCR service failed to initialize: {e}")
+    logger.warning("OCR service failed to initialize: %s", e)
     ocr_service = None
 
 try:
     scene_service = SceneService()
 except Exception as e:
-    print(f"Warning: Scene service failed to initialize: {e}")
+    logger.warning("Scene service failed to initialize: %s", e)
     scene_service = None
 
 try:
-    client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    # Same client, and connection pool, as the scene service
+    client = get_gemini_client()
 except Exception as e:
-    print(f"Warning: Gemini client failed to initialize: {e}")
+    logger.warning("Gemini client failed to initialize: %s", e)
     client = None
 
+# Dedicated pool for blocking Vision/Gemini calls, which mostly wait on the network;
+# keeps many upstream requests in flight without starving the CPU-bound default threadpool
+IO_POOL_SIZE = 64
+_IO_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=IO_POOL_SIZE, thread_name_prefix="io")
+
+async def run_io(func, *args):
+    """Run a blocking, network-bound call on the IO pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(_IO_POOL, func, *args)
+
 # Pydantic models for request/response
 class ImageRequest(BaseModel):
     image_url: str
@@ -89,41 +188,163 @@ class DailyRecapRequest(BaseModel):
     date: Optional[str] = None
 
 # Helper function to determine if query requires image
+def _phrase_pattern(*phrases: str) -> "re.Pattern":
+    """Compile phrases into one alternation that matches any of them as a substring."""
+    return re.compile("|".join(re.escape(phrase) for phrase in phrases))
+
+# Keywords that suggest a query is about the current image, matched anywhere in the query
+_IMAGE_KEYWORDS_RE = _phrase_pattern(
+    'see', 'look', 'what', 'describe', 'read', 'text', 'face', 'person',
+    'scene', 'picture', 'image', 'capture', 'screenshot', 'save', 'show',
+    'tell me about', 'what is', 'who is', 'identify', 'recognize'
+)
+
 def requires_image(query: str) -> bool:
     """Determine if a query requires image processing"""
-    image_keywords = [
-        'see', 'look', 'what', 'describe', 'read', 'text', 'face', 'person',
-        'scene', 'picture', 'image', 'capture', 'screenshot', 'save', 'show',
-        'tell me about', 'what is', 'who is', 'identify', 'recognize'
-    ]
-    
-    query_lower = query.lower()
-    return any(keyword in query_lower for keyword in image_keywords)
+    return _IMAGE_KEYWORDS_RE.search(query.lower()) is not None
 
-# Helper function to convert base64 to PIL Image
-def base64_to_image(base64_string: str) -> Image.Image:
-    """Convert base64 string to PIL Image"""
+# Keywords that make recognize_face a likely Gemini pick for /query
+_FACE_HINTS_RE = _phrase_pattern('who', 'face', 'person', 'recognize', 'identify', 'know this')
+
+def start_speculative_tasks(query: str, image: Image.Image) -> Dict[str, "asyncio.Task"]:
+    """
+    Start face recognition on the image while Gemini picks a function, if the
+    query hints at it.
+
+    Cancelling a task only stops the wait; a pass already running in the
+    threadpool still finishes. So only local face recognition is started this
+    way, never OCR, which would be a billed Vision request whatever Gemini picks.
+
+    Args:
+        query (str): The user's query
+        image (Image.Image): The image the query is about
+
+    Returns:
+        Dict[str, asyncio.Task]: Running tasks keyed by the function name they answer
+    """
+    query_lower = query.lower()
+    tasks = {}
+    if face_recognition is not None and _FACE_HINTS_RE.search(query_lower):
+        tasks["recognize_face"] = asyncio.ensure_future(
+            run_in_threadpool(face_recognition.find_face_from_image, image))
+    return tasks
+
+# Largest accepted base64 upload (~15 MB decoded), checked before any decoding
+MAX_B64 = 20 * 1024 * 1024
+MAX_UPLOAD_BYTES = MAX_B64 * 3 // 4
+
+def check_upload_size(base64_string: str) -> None:
+    """Reject an oversized base64 upload with a 413 before it is hashed or decoded"""
+    if len(base64_string) > MAX_B64:
+        raise HTTPException(status_code=413, detail="Image too large")
+
+async def read_upload(image: UploadFile) -> bytes:
+    """Read a multipart image upload, rejecting an oversized one with a 413"""
+    if image.size is not None and image.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    image_data = await image.read(MAX_UPLOAD_BYTES + 1)
+    if len(image_data) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    return image_data
+
+# Helper functions to convert base64 to PIL Image
+def base64_to_bytes(base64_string: str) -> bytes:
+    """Decode a base64 image string, with or without a data URL prefix, to the encoded image bytes"""
+    check_upload_size(base64_string)
     try:
-        print(f"Processing base64 image, length: {len(base64_string)}")
-        
         # Remove data URL prefix if present
         if base64_string.startswith('data:image'):
-            base64_string = base64_string.split(',')[1]
-            print("Removed data URL prefix")
-        
-        print(f"Base64 string after processing, length: {len(base64_string)}")
-        print(f"First 50 chars: {base64_string[:50]}...")
-        
-        image_data = base64.b64decode(base64_string)
-        print(f"Decoded image data size: {len(image_data)} bytes")
-        
-        image = Image.open(io.BytesIO(image_data))
-        print(f"Image opened successfully: {image.size} {image.mode}")
-        return image
+            base64_string = base64_string.split(',', 1)[1]
+        return base64.b64decode(base64_string)
+    except Exception as e:
+        logger.warning("Error in base64_to_bytes: %s", e)
+        raise HTTPException(status_code=400, detail=f"Invalid image format: {str(e)}")
+
+def bytes_to_image(image_data: bytes) -> Image.Image:
+    """Open encoded image bytes as a PIL Image"""
+    try:
+        return Image.open(io.BytesIO(image_data))
     except Exception as e:
-        print(f"Error in base64_to_image: {e}")
+        logger.warning("Error in base64_to_image: %s", e)
         raise HTTPException(status_code=400, detail=f"Invalid image format: {str(e)}")
 
+# Recently decoded uploads, so a frame sent to several endpoints in a row is decoded once
+UPLOAD_CACHE_SIZE = 8
+_upload_cache: "OrderedDict[object, Tuple[bytes, Image.Image]]" = OrderedDict()
+_upload_cache_lock = threading.Lock()
+
+def decode_upload(base64_string: str) -> Tuple[bytes, Image.Image]:
+    """
+    Decode a base64 upload to its encoded bytes and a fully loaded PIL Image,
+    reusing the result if the same upload was decoded recently.
+
+    Args:
+        base64_string (str): Base64 image, with or without a data URL prefix
+
+    Returns:
+        Tuple[bytes, Image.Image]: The encoded image bytes and the decoded image
+    """
+    check_upload_size(base64_string)
+    # Hash the whole upload; similar frames share long identical header prefixes
+    if xxhash is not None:
+        key = xxhash.xxh3_64_intdigest(base64_string.encode())
+    else:
+        key = hashlib.blake2b(base64_string.encode(), digest_size=16).digest()
+    with _upload_cache_lock:
+        cached = _upload_cache.get(key)
+        if cached is not None:
+            _upload_cache.move_to_end(key)
+            return cached
+
+    image_data = base64_to_bytes(base64_string)
+    image = bytes_to_image(image_data)
+    try:
+        # Decode now so the cached image is never lazily loaded from two threads at once
+        image.load()
+    except Exception as e:
+        logger.warning("Error in base64_to_image: %s", e)
+        raise HTTPException(status_code=400, detail=f"Invalid image format: {str(e)}")
+
+    with _upload_cache_lock:
+        _upload_cache[key] = (image_data, image)
+        _upload_cache.move_to_end(key)
+        if len(_upload_cache) > UPLOAD_CACHE_SIZE:
+            _upload_cache.popitem(last=False)
+    return image_data, image
+
+def base64_to_image(base64_string: str) -> Image.Image:
+    """Convert base64 string to PIL Image"""
+    return decode_upload(base64_string)[1]
+
+# Lower confidence bounds of each response style, and the matching templates
+CONFIDENCE_BANDS = (0.7, 0.8, 0.9)
+CONFIDENCE_TEMPLATES = (
+    "This could be {identity}, though I'm not very confident about this match.",
+    "I think this might be {identity}, but I'm not completely certain.",
+    "This looks like {identity}. I'm quite confident about this identification.",
+    "I can see {identity} in the image. I'm very confident this is them.",
+)
+
+def confidence_message(matches: List[Dict]) -> str:
+    """
+    Describe the best face match in a natural sentence, worded by confidence.
+
+    Args:
+        matches (List[Dict]): Matches sorted by confidence, highest first
+
+    Returns:
+        str: Message naming the best match and up to two other similar identities
+    """
+    best_match = matches[0]
+    template = CONFIDENCE_TEMPLATES[bisect.bisect_right(CONFIDENCE_BANDS, best_match["confidence"])]
+    message = template.format(identity=best_match["identity"])
+
+    # If there are multiple matches, mention them
+    if len(matches) > 1:
+        other_matches = [m["identity"] for m in matches[1:3]]  # Top 2 other matches
+        message += f" I also see some similarity to {', '.join(other_matches)}."
+    return message
+
 # Function definitions for Gemini
 functions = [
     {
@@ -171,6 +392,9 @@ functions = [
     },
 ]
 
+# Function-calling config for /query, built once since the declarations never change
+QUERY_CONFIG = types.GenerateContentConfig(tools=[types.Tool(function_declarations=functions)])
+
 # API endpoints
 @app.post("/recognize_face", response_model=FaceResponse)
 async def recognize_face(request: ImageQueryRequest):
@@ -178,31 +402,15 @@ async def recognize_face(request: ImageQueryRequest):
     if not request.image:
         raise HTTPException(status_code=400, detail="Image is required for face recognition")
     
-    image = base64_to_image(request.image)
-    matches = face_recognition.find_face_from_image(image)
+    # Decoding and inference run in the threadpool so they don't stall the event loop
+    image = await run_in_threadpool(base64_to_image, request.image)
+    matches = await run_in_threadpool(face_recognition.find_face_from_image, image)
     
     if not matches:
         return FaceResponse(matches=[])
     
     # Create a natural response with the person's name
-    best_match = matches[0]  # Get the highest confidence match
-    confidence = best_match["confidence"]
-    identity = best_match["identity"]
-    
-    # Create different response styles based on confidence
-    if confidence >= 0.9:
-        message = f"I can see {identity} in the image. I'm very confident this is them."
-    elif confidence >= 0.8:
-        message = f"This looks like {identity}. I'm quite confident about this identification."
-    elif confidence >= 0.7:
-        message = f"I think this might be {identity}, but I'm not completely certain."
-    else:
-        message = f"This could be {identity}, though I'm not very confident about this match."
-    
-    # If there are multiple matches, mention them
-    if len(matches) > 1:
-        other_matches = [m["identity"] for m in matches[1:3]]  # Top 2 other matches
-        message += f" I also see some similarity to {', '.join(other_matches)}."
+    message = confidence_message(matches)
     
     # Add the message to each match for consistency
     for match in matches:
@@ -210,21 +418,50 @@ async def recognize_face(request: ImageQueryRequest):
     
     return FaceResponse(matches=matches)
 
+async def extract_text_from_upload(image_data: bytes) -> OCRResponse:
+    """Run OCR on encoded image bytes, skipping the decode when Vision can read them as-is."""
+    if sniff_image_mime(image_data):
+        # Vision reads the upload directly, no need to decode it here
+        text_lines = await run_io(ocr_service.extract_text_from_bytes, image_data)
+    else:
+        image = bytes_to_image(image_data)
+        text_lines = await run_io(ocr_service.extract_text_from_image, image)
+    return OCRResponse(text_lines=text_lines)
+
+async def describe_scene_from_upload(image_data: bytes) -> Dict:
+    """Describe encoded image bytes, skipping the decode when Gemini can read them as-is."""
+    mime_type = sniff_image_mime(image_data)
+    if mime_type:
+        # Gemini reads the upload directly, no need to decode it here
+        result = await run_io(scene_service.describe_scene_from_bytes, image_data, mime_type)
+    else:
+        image = bytes_to_image(image_data)
+        result = await run_io(scene_service.describe_scene_from_image, image)
+    if result["status"] == "error":
+        raise HTTPException(status_code=400, detail=result["message"])
+    return result
+
 @app.post("/extract_text", response_model=OCRResponse)
 async def extract_text(request: OCRRequest):
     """Extract text from the given image."""
-    image = base64_to_image(request.image)
-    text_lines = ocr_service.extract_text_from_image(image)
-    return OCRResponse(text_lines=text_lines)
+    image_data = await run_in_threadpool(base64_to_bytes, request.image)
+    return await extract_text_from_upload(image_data)
+
+@app.post("/extract_text_upload", response_model=OCRResponse)
+async def extract_text_upload(image: UploadFile = File(...)):
+    """Extract text from an image sent as raw multipart bytes instead of base64 JSON."""
+    return await extract_text_from_upload(await read_upload(image))
 
 @app.post("/describe_scene")
 async def describe_scene(request: SceneDescriptionRequest):
     """Describe a single scene from the provided image."""
-    image = base64_to_image(request.image)
-    result = scene_service.describe_scene_from_image(image)
-    if result["status"] == "error":
-        raise HTTPException(status_code=400, detail=result["message"])
-    return result
+    image_data = await run_in_threadpool(base64_to_bytes, request.image)
+    return await describe_scene_from_upload(image_data)
+
+@app.post("/describe_scene_upload")
+async def describe_scene_upload(image: UploadFile = File(...)):
+    """Describe a single scene from an image sent as raw multipart bytes instead of base64 JSON."""
+    return await describe_scene_from_upload(await read_upload(image))
 
 @app.post("/save_face")
 async def save_face(request: SaveFaceRequest):
@@ -232,8 +469,8 @@ async def save_face(request: SaveFaceRequest):
     if not request.image:
         raise HTTPException(status_code=400, detail="I need an image to save a face. Please provide a photo with your request.")
     
-    image = base64_to_image(request.image)
-    success = face_recognition.add_face_from_image(request.identity, image)
+    image = await run_in_threadpool(base64_to_image, request.image)
+    success = await run_in_threadpool(face_recognition.add_face_from_image, request.identity, image)
     if not success:
         raise HTTPException(status_code=400, detail="I couldn't save that face. There might be an issue with the image or the face might not be clearly visible.")
     return {"status": "success", "message": f"Face saved as {request.identity}"}
@@ -244,8 +481,8 @@ async def save_screenshot(request: ImageQueryRequest):
     if not request.image:
         raise HTTPException(status_code=400, detail="I need an image to save a screenshot. Please provide a photo with your request.")
     
-    image = base64_to_image(request.image)
-    result = scene_service.save_screenshot_from_image(image)
+    image = await run_in_threadpool(base64_to_image, request.image)
+    result = await run_in_threadpool(scene_service.save_screenshot_from_image, image)
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result["message"])
     return result
@@ -255,7 +492,7 @@ async def get_daily_recap(request: DailyRecapRequest):
     """Get a comprehensive description of all scenes from a specific date."""
     # Use provided date or default to today
     date_param = request.date if request.date else datetime.now().strftime("%Y%m%d")
-    result = scene_service.get_daily_recap(date_param)
+    result = await run_io(scene_service.get_daily_recap, date_param)
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result["message"])
     return result
@@ -263,7 +500,7 @@ async def get_daily_recap(request: DailyRecapRequest):
 @app.post("/query")
 async def process_query(request: ImageQueryRequest):
     """Process a natural language query and determine which function to call."""
-    print("Received request to /query endpoint.")
+    logger.debug("Received request to /query endpoint.")
     
     # Check if query requires image
     if requires_image(request.query):
@@ -274,40 +511,54 @@ async def process_query(request: ImageQueryRequest):
                 "requires_image": True
             }
     
+    speculative = {}
     try:
-        tools = types.Tool(function_declarations=functions)
-        config = types.GenerateContentConfig(tools=[tools])
-
         # Use provided image or get from camera
+        image_bytes, mime_type = None, None
         if request.image:
-            current_image = base64_to_image(request.image)
+            image_bytes, current_image = await run_in_threadpool(decode_upload, request.image)
+            # Forward the client's upload as-is when Gemini can read its format
+            mime_type = sniff_image_mime(image_bytes)
         else:
-            current_image = get_latest_frame()
+            # Only blocks on the network if the background grabber isn't running
+            current_image = await run_in_threadpool(get_latest_frame)
             if current_image is None:
                 return {
                     "status": "error",
                     "message": "No image available and no image provided in request"
                 }
 
-        image_bytes = io.BytesIO()
-        current_image.save(image_bytes, format="PNG")
-        image_bytes = image_bytes.getvalue()
+        # Overlap the likely local work with the Gemini round trip
+        speculative = start_speculative_tasks(request.query, current_image)
+
+        if mime_type is None:
+            # JPEG is far cheaper to encode than PNG and Gemini accepts it directly
+            image_bytes, mime_type = await run_in_threadpool(encode_jpeg, current_image), "image/jpeg"
 
         # Generate function calling response from Gemini
-        response = client.models.generate_content(
+        # The async client awaits the Gemini round trip on the event loop itself
+        response = await client.aio.models.generate_content(
             model="gemini-2.0-flash",
             contents=[
-                types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
+                types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
                 request.query,
             ],
-            config=config,
+            config=QUERY_CONFIG,
         )
 
         # Extract function call details
         function_call = response.candidates[0].content.parts[0].function_call
         if function_call:
+            # Stop waiting on whatever was started for a function Gemini didn't choose
+            for name, task in speculative.items():
+                if name != function_call.name:
+                    task.cancel()
+
             if function_call.name == "recognize_face":
-                matches = face_recognition.find_face_from_image(current_image)
+                if "recognize_face" in speculative:
+                    matches = await speculative["recognize_face"]
+                else:
+                    matches = await run_in_threadpool(face_recognition.find_face_from_image, current_image)
                 if not matches:
                     return {
                         "function": "recognize_face",
@@ -318,24 +569,7 @@ async def process_query(request: ImageQueryRequest):
                     }
                 
                 # Create a natural response with the person's name
-                best_match = matches[0]  # Get the highest confidence match
-                confidence = best_match["confidence"]
-                identity = best_match["identity"]
-                
-                # Create different response styles based on confidence
-                if confidence >= 0.9:
-                    message = f"I can see {identity} in the image. I'm very confident this is them."
-                elif confidence >= 0.8:
-                    message = f"This looks like {identity}. I'm quite confident about this identification."
-                elif confidence >= 0.7:
-                    message = f"I think this might be {identity}, but I'm not completely certain."
-                else:
-                    message = f"This could be {identity}, though I'm not very confident about this match."
-                
-                # If there are multiple matches, mention them
-                if len(matches) > 1:
-                    other_matches = [m["identity"] for m in matches[1:3]]  # Top 2 other matches
-                    message += f" I also see some similarity to {', '.join(other_matches)}."
+                message = confidence_message(matches)
                 
                 return {
                     "function": "recognize_face",
@@ -346,13 +580,13 @@ async def process_query(request: ImageQueryRequest):
                     },
                 }
             elif function_call.name == "extract_text":
-                text_lines = ocr_service.extract_text_from_image(current_image)
+                text_lines = await run_io(ocr_service.extract_text_from_image, current_image)
                 return {
                     "function": "extract_text",
                     "result": {"status": "success", "text": text_lines},
                 }
             elif function_call.name == "save_face":
-                success = face_recognition.add_face_from_image(function_call.args["identity"], current_image)
+                success = await run_in_threadpool(face_recognition.add_face_from_image, function_call.args["identity"], current_image)
                 if not success:
                     raise HTTPException(status_code=400, detail="I couldn't save that face. There might be an issue with the image or the face might not be clearly visible.")
                 return {
@@ -363,12 +597,12 @@ async def process_query(request: ImageQueryRequest):
                     },
                 }
             elif function_call.name == "save_screenshot":
-                result = scene_service.save_screenshot_from_image(current_image)
+                result = await run_in_threadpool(scene_service.save_screenshot_from_image, current_image)
                 if result["status"] == "error":
                     raise HTTPException(status_code=400, detail=result["message"])
                 return {"function": "save_screenshot", "result": result}
             elif function_call.name == "describe_scene":
-                result = scene_service.describe_scene_from_image(current_image)
+                result = await run_io(scene_service.describe_scene_from_image, current_image)
                 if result["status"] == "error":
                     raise HTTPException(status_code=400, detail=result["message"])
                 return {"function": "describe_scene", "result": result}
@@ -378,133 +612,44 @@ async def process_query(request: ImageQueryRequest):
                 if not date_param:
                     # Parse date from the original query
                     date_param = parse_natural_language_date(request.query)
-                    print(f"Parsed date from query '{request.query}': {date_param}")
+                    logger.debug("Parsed date from query %r: %s", request.query, date_param)
                 
-                result = scene_service.get_daily_recap(date_param)
+                result = await run_io(scene_service.get_daily_recap, date_param)
                 if result["status"] == "error":
                     raise HTTPException(status_code=400, detail=result["message"])
                 return {"function": "get_daily_recap", "result": result}
             else:
                 return {"response": response}
         else:
+            for task in speculative.values():
+                task.cancel()
             return {"text": strip_markdown(response.candidates[0].content.parts[0].text)}
 
     except Exception as e:
+        # Stop waiting on speculative work if Gemini or a handler failed
+        for task in speculative.values():
+            task.cancel()
         raise e
 
 # Legacy endpoints for backward compatibility
 @app.post("/recognize_face_legacy", response_model=FaceResponse)
 async def recognize_face_legacy():
     """Legacy endpoint - Recognize a face in the current camera frame."""
-    matches = face_recognition.find_face()
+    matches = await run_in_threadpool(face_recognition.find_face)
     return FaceResponse(matches=matches)
 
 @app.post("/extract_text_legacy", response_model=OCRResponse)
 async def extract_text_legacy():
     """Legacy endpoint - Extract text from the current camera frame."""
-    text_lines = ocr_service.extract_text()
+    text_lines = await run_io(ocr_service.extract_text)
     return OCRResponse(text_lines=text_lines)
 
 @app.post("/describe_scene_legacy")
 async def describe_scene_legacy():
     """Legacy endpoint - Describe the current camera scene."""
-    result = scene_service.describe_scene()
+    result = await run_io(scene_service.describe_scene)
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result["message"])
     return result
 
-def parse_natural_language_date(query: str) -> str:
-    """
-    Parse natural language date expressions and return YYYYMMDD format.
-    
-    Examples:
-    - "Recap my day so far" -> today
-    - "Give me a recap of what my day was like yesterday" -> yesterday
-    - "I need to know what I did two weeks ago" -> two weeks ago
-    - "What happened on the 6th of June?" -> June 6th of current year
-    - "What happened last Monday?" -> last Monday
-    """
-    query_lower = query.lower().strip()
-    
-    # Handle relative dates
-    if any(phrase in query_lower for phrase in ["today", "my day so far", "this day", "current day"]):
-        return datetime.now().strftime("%Y%m%d")
-    
-    if any(phrase in query_lower for phrase in ["yesterday", "yesterdays"]):
-        yesterday = datetime.now() - timedelta(days=1)
-        return yesterday.strftime("%Y%m%d")
-    
-    if any(phrase in query_lower for phrase in ["tomorrow", "tomorrows"]):
-        tomorrow = datetime.now() + timedelta(days=1)
-        return tomorrow.strftime("%Y%m%d")
-    
-    # Handle "X days ago"
-    import re
-    days_ago_match = re.search(r'(\d+)\s+days?\s+ago', query_lower)
-    if days_ago_match:
-        days = int(days_ago_match.group(1))
-        target_date = datetime.now() - timedelta(days=days)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "X weeks ago"
-    weeks_ago_match = re.search(r'(\d+)\s+weeks?\s+ago', query_lower)
-    if weeks_ago_match:
-        weeks = int(weeks_ago_match.group(1))
-        target_date = datetime.now() - timedelta(weeks=weeks)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "X months ago"
-    months_ago_match = re.search(r'(\d+)\s+months?\s+ago', query_lower)
-    if months_ago_match:
-        months = int(months_ago_match.group(1))
-        target_date = datetime.now() - relativedelta.relativedelta(months=months)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "X years ago"
-    years_ago_match = re.search(r'(\d+)\s+years?\s+ago', query_lower)
-    if years_ago_match:
-        years = int(years_ago_match.group(1))
-        target_date = datetime.now() - relativedelta.relativedelta(years=years)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "last week", "last month", etc.
-    if "last week" in query_lower:
-        target_date = datetime.now() - timedelta(weeks=1)
-        return target_date.strftime("%Y%m%d")
-    
-    if "last month" in query_lower:
-        target_date = datetime.now() - relativedelta.relativedelta(months=1)
-        return target_date.strftime("%Y%m%d")
-    
-    if "last year" in query_lower:
-        target_date = datetime.now() - relativedelta.relativedelta(years=1)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle specific weekdays
-    weekdays = {
-        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-        "friday": 4, "saturday": 5, "sunday": 6
-    }
-    
-    for day_name, day_num in weekdays.items():
-        if f"last {day_name}" in query_lower:
-            today = datetime.now()
-            days_since = (today.weekday() - day_num) % 7
-            if days_since == 0:
-                days_since = 7  # Last week's same day
-            target_date = today - timedelta(days=days_since)
-            return target_date.strftime("%Y%m%d")
-    
-    # Handle absolute dates like "6th of June", "June 6th"
-    try:
-        # Try to parse with dateutil
-        parsed_date = parser.parse(query, fuzzy=True)
-        return parsed_date.strftime("%Y%m%d")
-    except:
-        pass
-    
-    # If all else fails, return today's date
-    print(f"Could not parse date from query: '{query}', defaulting to today")
-    return datetime.now().strftime("%Y%m%d")
-
 # App is imported by run.py
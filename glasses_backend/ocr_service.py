@@ -1,12 +1,30 @@
 import os
-import numpy as np
+import hashlib
+import logging
+try:
+    # Non-cryptographic hash, an order of magnitude faster than hashlib on multi-MB images
+    import xxhash
+except ImportError:
+    xxhash = None
+import threading
+from collections import OrderedDict
 from typing import List, Optional
 from google.cloud import vision
 import requests
 from io import BytesIO
 from PIL import Image
 
-from camera_service import get_latest_frame
+from camera_service import get_latest_frame, encode_jpeg
+
+logger = logging.getLogger(__name__)
+
+# OCR results kept in memory, keyed by a hash of the encoded image
+CACHE_SIZE = 512
+
+
+def split_text_lines(full_text: str) -> List[str]:
+    """Split OCR text into stripped, non-empty lines, stripping each line once."""
+    return [line for line in map(str.strip, full_text.split("\n")) if line]
 
 
 class OCRService:
@@ -15,11 +33,43 @@ class OCRService:
         Initialize the OCR service using Google Cloud Vision API.
         Requires GOOGLE_APPLICATION_CREDENTIALS environment variable to be set.
         """
-        self.client = vision.ImageAnnotatorClient()
-
-    def get_current_image(self) -> Optional[np.ndarray]:
-        latest_frame = get_latest_frame()
-        return np.array(latest_frame)
+        self._client: Optional[vision.ImageAnnotatorClient] = None
+        self._client_lock = threading.Lock()
+        self._cache: "OrderedDict[object, List[str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def client(self) -> vision.ImageAnnotatorClient:
+        """Vision client, created on first use so startup doesn't pay for the gRPC channel."""
+        if self._client is None:
+            with self._client_lock:
+                # Re-check under the lock so concurrent first requests share one channel
+                if self._client is None:
+                    self._client = vision.ImageAnnotatorClient()
+        return self._client
+
+    def _cache_get(self, key: object) -> Optional[List[str]]:
+        """Return cached text lines for an image hash, marking them most recently used."""
+        with self._cache_lock:
+            text_lines = self._cache.get(key)
+            if text_lines is not None:
+                self._cache.move_to_end(key)
+                return list(text_lines)
+        return None
+
+    def _cache_put(self, key: object, text_lines: List[str]):
+        """Store text lines for an image hash, evicting the least recently used entry."""
+        with self._cache_lock:
+            self._cache[key] = list(text_lines)
+            self._cache.move_to_end(key)
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _cache_key(content: bytes) -> object:
+        if xxhash is not None:
+            return xxhash.xxh3_64_intdigest(content)
+        return hashlib.blake2b(content, digest_size=16).digest()
 
     def extract_text_from_image(self, image: Image.Image) -> List[str]:
         """
@@ -31,39 +81,59 @@ class OCRService:
         Returns:
             List[str]: List of extracted text blocks, or ["No text is shown in the image"] if no text found
         """
-        print("OCRService: Entering extract_text_from_image function.")
+        logger.debug("Entering extract_text_from_image.")
+        try:
+            # Vision needs an encoded image, not raw pixel bytes
+            content = encode_jpeg(image)
+        except Exception as e:
+            logger.error("Error in OCR processing: %s", e)
+            return ["No text is shown in the image"]
+        return self.extract_text_from_bytes(content)
+
+    def extract_text_from_bytes(self, content: bytes) -> List[str]:
+        """
+        Extract text from an already encoded image using Google Cloud Vision API.
+
+        Args:
+            content (bytes): JPEG, PNG or other Vision-supported image bytes
+
+        Returns:
+            List[str]: List of extracted text blocks, or ["No text is shown in the image"] if no text found
+        """
         try:
-            # Convert PIL Image to numpy array
-            image_array = np.array(image)
-            
-            # Create image object for Google Cloud Vision
-            print("OCRService: Creating Vision Image object.")
-            vision_image = vision.Image(content=image_array.tobytes())
+            key = self._cache_key(content)
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.debug("Returning cached OCR result.")
+                return cached
+
+            logger.debug("Creating Vision Image object.")
+            vision_image = vision.Image(content=content)
 
             # Perform text detection
-            print("OCRService: Performing text detection with Google Cloud Vision.")
+            logger.debug("Performing text detection with Google Cloud Vision.")
             response = self.client.text_detection(image=vision_image)
             texts = response.text_annotations
 
             if not texts:
-                print("OCRService: No text detected.")
+                logger.debug("No text detected.")
+                self._cache_put(key, ["No text is shown in the image"])
                 return ["No text is shown in the image"]
 
             # Extract text from annotations
             # First annotation contains the entire text
             full_text = texts[0].description
-            print(f"OCRService: Full text detected: {full_text}")
+            logger.debug("Full text detected: %s", full_text)
 
             # Split into lines and clean up
-            text_lines = [
-                line.strip() for line in full_text.split("\n") if line.strip()
-            ]
-            print(f"OCRService: Extracted text lines: {text_lines}")
+            text_lines = split_text_lines(full_text)
+            logger.debug("Extracted text lines: %s", text_lines)
 
+            self._cache_put(key, text_lines)
             return text_lines
 
         except Exception as e:
-            print(f"OCRService: Error in OCR processing: {e}")
+            logger.error("Error in OCR processing: %s", e)
             return ["No text is shown in the image"]
 
     def extract_text(self) -> List[str]:
@@ -74,40 +144,12 @@ class OCRService:
         Returns:
             List[str]: List of extracted text blocks, or ["No text is shown in the image"] if no text found
         """
-        print("OCRService: Entering extract_text function.")
-        # Download the image
-        image_content = self.get_current_image()
-        if image_content is None:
-            print("OCRService: No image available for OCR.")
+        logger.debug("Entering extract_text.")
+        # Get the latest camera frame
+        frame = get_latest_frame()
+        if frame is None:
+            logger.warning("No image available for OCR.")
             return ["No text is shown in the image"]
 
-        try:
-            # Create image object for Google Cloud Vision
-            print("OCRService: Creating Vision Image object.")
-            image = vision.Image(content=image_content)
-
-            # Perform text detection
-            print("OCRService: Performing text detection with Google Cloud Vision.")
-            response = self.client.text_detection(image=image)
-            texts = response.text_annotations
-
-            if not texts:
-                print("OCRService: No text detected.")
-                return ["No text is shown in the image"]
-
-            # Extract text from annotations
-            # First annotation contains the entire text
-            full_text = texts[0].description
-            print(f"OCRService: Full text detected: {full_text}")
-
-            # Split into lines and clean up
-            text_lines = [
-                line.strip() for line in full_text.split("\n") if line.strip()
-            ]
-            print(f"OCRService: Extracted text lines: {text_lines}")
-
-            return text_lines
-
-        except Exception as e:
-            print(f"OCRService: Error in OCR processing: {e}")
-            return ["No text is shown in the image"]
+        # Same path as uploaded images, so camera frames share the result cache
+        return self.extract_text_from_image(frame)
@@ -1,4 +1,11 @@
+import importlib.util
 import uvicorn
 
+# uvloop (libuv) and httptools replace the pure-Python event loop and HTTP parser;
+# uvloop has no Windows build, so fall back to asyncio there
+LOOP = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+HTTP = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # Single worker: the face database, frame grabber and caches live in-process
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, loop=LOOP, http=HTTP)
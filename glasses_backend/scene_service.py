@@ -1,23 +1,158 @@
 import io
 import os
+import logging
+import functools
+import math
+import importlib.util
 import cv2
+import hashlib
+import threading
+import queue
+import httpx
 import numpy as np
 import re
-from datetime import datetime
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple
+try:
+    # Non-cryptographic hash, an order of magnitude faster than hashlib on multi-MB images
+    import xxhash
+except ImportError:
+    xxhash = None
 
 # import google.generativeai as genai
 from google import genai
 from google.genai import types
 from dotenv import load_dotenv
-from PIL import Image
+from PIL import Image, ImageOps
 
 # Create the Part object with the image data
-from camera_service import get_latest_frame
+from camera_service import get_latest_frame, encode_jpeg, sniff_image_mime
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Scene files for a daily recap are read and encoded in parallel on this pool
+SCENE_LOAD_WORKERS = 8
+_scene_pool = ThreadPoolExecutor(max_workers=SCENE_LOAD_WORKERS, thread_name_prefix="scene-load")
+
+# Saved scenes uploaded through the Gemini Files API, so repeat recaps send a URI instead of the bytes.
+# Live frames are only ever sent inline, since a frame is rarely seen twice
+FILE_CACHE_SIZE = 64
+# Files expire after 48 hours; stop using them a little before that
+FILE_EXPIRY_MARGIN = timedelta(minutes=30)
+_upload_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gemini-upload")
+
+# Gemini answers kept in memory, keyed by image content (or the day's scene files) and prompt
+RESPONSE_CACHE_SIZE = 128
+
+# Longest side of images sent to Gemini, which downsamples larger inputs itself anyway
+GEMINI_MAX_SIDE = 1024
+
+# Screenshots that can be waiting for the save thread before callers block
+SAVE_QUEUE_SIZE = 32
+
+# JPEG quality of scenes saved to disk; PIL's default, which the saves used before
+SCENE_JPEG_QUALITY = 75
+
+# Prompts and user-facing errors for the single-image Gemini requests
+DESCRIBE_PROMPT = "Describe what you see in this photo in a natural, conversational way. Focus on the general scene, any people, and what might be happening. Speak as if you're describing it to a friend."
+DESCRIBE_ERROR = "I'm having trouble describing what I see in that image. The image might be unclear or there could be a processing issue."
+QUERY_ERROR = "I'm having trouble analyzing that image right now. The image might be unclear or there could be a processing issue."
+
+
+# Connection pool for Gemini requests; idle connections stay open between a user's queries
+GEMINI_MAX_CONNECTIONS = 16
+GEMINI_KEEPALIVE_SECONDS = 120.0
+
+
+@functools.lru_cache(maxsize=None)
+def get_gemini_client() -> genai.Client:
+    """
+    Return the process-wide Gemini client, created on first use.
+
+    Its sync and async httpx transports keep a pool of warm connections, and use
+    HTTP/2 when the h2 package is installed, so requests after the first skip the
+    TCP and TLS handshakes.
+
+    Returns:
+        genai.Client: The shared client
+    """
+    client_args = {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(
+            max_connections=GEMINI_MAX_CONNECTIONS,
+            max_keepalive_connections=GEMINI_MAX_CONNECTIONS,
+            keepalive_expiry=GEMINI_KEEPALIVE_SECONDS,
+        ),
+    }
+    return genai.Client(
+        api_key=os.getenv("GOOGLE_API_KEY"),
+        http_options=types.HttpOptions(client_args=client_args, async_client_args=dict(client_args)),
+    )
+
+
+def fit_for_gemini(image: Image.Image) -> Image.Image:
+    """Shrink an image to fit GEMINI_MAX_SIDE, keeping its aspect ratio; smaller images are returned as-is."""
+    if max(image.size) <= GEMINI_MAX_SIDE:
+        return image
+    # Bilinear keeps the resize itself cheap
+    return ImageOps.contain(image, (GEMINI_MAX_SIDE, GEMINI_MAX_SIDE), method=Image.Resampling.BILINEAR)
+
+
+def _parse_scene_ts(filename: str) -> Optional[Tuple[str, str]]:
+    """
+    Read the capture time from a scene filename (scene_YYYYMMDD_HHMMSS.jpg).
+
+    Args:
+        filename (str): Scene file name, without directory
+
+    Returns:
+        Optional[Tuple[str, str]]: (HH:MM:SS, YYYY-MM-DD), or None if the name isn't in that format
+    """
+    stamp = filename[6:21]
+    if not (filename.startswith("scene_") and len(stamp) == 15 and stamp[8] == "_"
+            and stamp[:8].isdigit() and stamp[9:].isdigit()):
+        return None
+    return (
+        f"{stamp[9:11]}:{stamp[11:13]}:{stamp[13:15]}",
+        f"{stamp[:4]}-{stamp[4:6]}-{stamp[6:8]}",
+    )
+
+
+def _content_key(data: bytes) -> object:
+    """Hash encoded image bytes for use as a cache key."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# Markdown patterns for strip_markdown, compiled once
+_HEADER_RE = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+_BOLD_STARS_RE = re.compile(r'\*\*(.*?)\*\*')
+_BOLD_UNDERSCORES_RE = re.compile(r'__(.*?)__')
+_ITALIC_STAR_RE = re.compile(r'\*(.*?)\*')
+_ITALIC_UNDERSCORE_RE = re.compile(r'_(.*?)_')
+_CODE_BLOCK_RE = re.compile(r'```.*?```', re.DOTALL)
+_INLINE_CODE_RE = re.compile(r'`(.*?)`')
+_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+# Both rule forms match whole lines only, so one alternation removes the same lines as two passes
+_HORIZONTAL_RULE_RE = re.compile(r'^(?:---|\*\*\*)$', re.MULTILINE)
+_BLOCKQUOTE_RE = re.compile(r'^>\s+', re.MULTILINE)
+_BULLET_RE = re.compile(r'^[\s]*[-*+]\s+', re.MULTILINE)
+_NUMBERED_RE = re.compile(r'^[\s]*\d+\.\s+', re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n')
+_LEADING_SPACE_RE = re.compile(r'^\s+', re.MULTILINE)
+_TRAILING_SPACE_RE = re.compile(r'\s+$', re.MULTILINE)
+_EMPTY_BULLET_RE = re.compile(r'^\s*[-*+]\s*$', re.MULTILINE)
+_EMPTY_NUMBERED_RE = re.compile(r'^\s*\d+\.\s*$', re.MULTILINE)
+# Line-anchored patterns are tried at every offset, so each is skipped when the text
+# lacks a character it needs; earlier passes only ever delete characters
+_LIST_NUMBER_RE = re.compile(r'\d\.')
+
 
 def strip_markdown(text: str) -> str:
     """
@@ -33,44 +168,52 @@ def strip_markdown(text: str) -> str:
         return text
     
     # Remove markdown headers
-    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+    if '#' in text:
+        text = _HEADER_RE.sub('', text)
     
     # Remove bold formatting
-    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-    text = re.sub(r'__(.*?)__', r'\1', text)
+    text = _BOLD_STARS_RE.sub(r'\1', text)
+    text = _BOLD_UNDERSCORES_RE.sub(r'\1', text)
     
     # Remove italic formatting
-    text = re.sub(r'\*(.*?)\*', r'\1', text)
-    text = re.sub(r'_(.*?)_', r'\1', text)
+    text = _ITALIC_STAR_RE.sub(r'\1', text)
+    text = _ITALIC_UNDERSCORE_RE.sub(r'\1', text)
     
     # Remove code blocks
-    text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
+    text = _CODE_BLOCK_RE.sub('', text)
     
     # Remove inline code
-    text = re.sub(r'`(.*?)`', r'\1', text)
+    text = _INLINE_CODE_RE.sub(r'\1', text)
     
     # Remove links but keep the text
-    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+    text = _LINK_RE.sub(r'\1', text)
     
     # Remove horizontal rules
-    text = re.sub(r'^---$', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^\*\*\*$', '', text, flags=re.MULTILINE)
+    if '---' in text or '***' in text:
+        text = _HORIZONTAL_RULE_RE.sub('', text)
     
     # Remove blockquotes
-    text = re.sub(r'^>\s+', '', text, flags=re.MULTILINE)
+    if '>' in text:
+        text = _BLOCKQUOTE_RE.sub('', text)
     
     # Remove list markers but keep the content
-    text = re.sub(r'^[\s]*[-*+]\s+', '', text, flags=re.MULTILINE)
-    text = re.sub(r'^[\s]*\d+\.\s+', '', text, flags=re.MULTILINE)
+    has_bullets = '-' in text or '*' in text or '+' in text
+    has_numbers = _LIST_NUMBER_RE.search(text) is not None
+    if has_bullets:
+        text = _BULLET_RE.sub('', text)
+    if has_numbers:
+        text = _NUMBERED_RE.sub('', text)
     
     # Clean up extra whitespace
-    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)  # Multiple newlines to double newlines
-    text = re.sub(r'^\s+', '', text, flags=re.MULTILINE)  # Leading whitespace
-    text = re.sub(r'\s+$', '', text, flags=re.MULTILINE)  # Trailing whitespace
+    text = _BLANK_LINES_RE.sub('\n\n', text)  # Multiple newlines to double newlines
+    text = _LEADING_SPACE_RE.sub('', text)  # Leading whitespace
+    text = _TRAILING_SPACE_RE.sub('', text)  # Trailing whitespace
     
     # Remove any remaining markdown-like patterns
-    text = re.sub(r'^\s*[-*+]\s*$', '', text, flags=re.MULTILINE)  # Empty list items
-    text = re.sub(r'^\s*\d+\.\s*$', '', text, flags=re.MULTILINE)  # Empty numbered items
+    if has_bullets:
+        text = _EMPTY_BULLET_RE.sub('', text)  # Empty list items
+    if has_numbers:
+        text = _EMPTY_NUMBERED_RE.sub('', text)  # Empty numbered items
     
     return text.strip()
 
@@ -79,9 +222,124 @@ class SceneService:
     def __init__(self):
         self.scenes_dir = "scenes"
         self.ensure_scenes_directory()
-        self.client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+        self.client = get_gemini_client()
+        # Scene paths by YYYYMMDD date, rebuilt whenever the directory changes outside this service
+        self._scene_index: Optional[Dict[str, List[str]]] = None
+        self._scene_index_mtime: Optional[int] = None
+        self._scene_index_lock = threading.Lock()
+        self._responses: "OrderedDict[object, Dict]" = OrderedDict()
+        self._responses_lock = threading.Lock()
+        self._uploaded_files: "OrderedDict[object, Future]" = OrderedDict()
+        self._uploaded_files_lock = threading.Lock()
+        # Screenshots waiting to be written; bounded so a stalled disk pushes back on callers
+        self._save_queue: "queue.Queue[Tuple[Image.Image, str, str]]" = queue.Queue(maxsize=SAVE_QUEUE_SIZE)
+        threading.Thread(target=self._save_worker, name="scene-save", daemon=True).start()
         # self.model = genai.GenerativeModel("models/gemini-1.5-pro-001")
 
+    def _response_get(self, key: object) -> Optional[Dict]:
+        """Return a cached Gemini result, marking it most recently used."""
+        with self._responses_lock:
+            result = self._responses.get(key)
+            if result is not None:
+                self._responses.move_to_end(key)
+                return dict(result)
+        return None
+
+    def _response_put(self, key: object, result: Dict):
+        """Store a successful Gemini result, evicting the least recently used entry."""
+        with self._responses_lock:
+            self._responses[key] = dict(result)
+            self._responses.move_to_end(key)
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+
+    @staticmethod
+    def _scene_set_key(scenes: List[str]) -> Optional[object]:
+        """
+        Key a set of scene files by their paths, sizes and modification times,
+        so the key changes whenever a photo is added, removed or replaced.
+
+        Returns:
+            Optional[object]: The cache key, or None if a file couldn't be read
+        """
+        try:
+            parts = []
+            for path in sorted(scenes):
+                st = os.stat(path)
+                parts.append(f"{path}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            return None
+        return ("daily_recap", _content_key("|".join(parts).encode()))
+
+    def _upload_file(self, image_bytes: bytes, mime_type: str) -> types.File:
+        """Upload encoded image bytes to the Gemini Files API."""
+        return self.client.files.upload(
+            file=io.BytesIO(image_bytes),
+            config=types.UploadFileConfig(mime_type=mime_type),
+        )
+
+    def _uploaded_part(self, key: object) -> Optional[types.Part]:
+        """
+        Return a file URI Part for a finished, unexpired Files API upload.
+
+        Args:
+            key (object): Upload cache key
+
+        Returns:
+            Optional[types.Part]: The URI part, or None if no usable upload exists yet
+        """
+        with self._uploaded_files_lock:
+            upload = self._uploaded_files.get(key)
+            if upload is not None:
+                self._uploaded_files.move_to_end(key)
+        if upload is None or not upload.done():
+            return None
+
+        try:
+            uploaded = upload.result()
+            expires = uploaded.expiration_time
+            if uploaded.uri and (expires is None or expires - FILE_EXPIRY_MARGIN > datetime.now(timezone.utc)):
+                return types.Part.from_uri(file_uri=uploaded.uri, mime_type=uploaded.mime_type)
+        except Exception as e:
+            logger.warning("Error uploading image to Gemini Files API: %s", e)
+        # Failed or expired; upload again next time
+        with self._uploaded_files_lock:
+            if self._uploaded_files.get(key) is upload:
+                del self._uploaded_files[key]
+        return None
+
+    def _image_part(self, image_bytes: bytes, mime_type: str, key: Optional[object] = None) -> types.Part:
+        """
+        Build the Gemini Part for an encoded image, referring to an earlier
+        Files API upload of the same image when one is ready.
+
+        Only images given an upload key (saved scenes) go through the Files
+        API: the first time one is seen it is sent inline and uploaded in the
+        background, so only later requests on it use the URI. Images without
+        a key, such as live camera frames, are always sent inline.
+
+        Args:
+            image_bytes (bytes): Encoded image
+            mime_type (str): MIME type of the encoded image
+            key (Optional[object]): Upload cache key, or None to send inline only
+
+        Returns:
+            types.Part: A file URI part, or an inline bytes part
+        """
+        if key is None:
+            return types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+        part = self._uploaded_part(key)
+        if part is not None:
+            return part
+
+        with self._uploaded_files_lock:
+            if key not in self._uploaded_files:
+                self._uploaded_files[key] = _upload_pool.submit(self._upload_file, image_bytes, mime_type)
+                if len(self._uploaded_files) > FILE_CACHE_SIZE:
+                    self._uploaded_files.popitem(last=False)
+
+        return types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+
     def get_current_image(self):
         latest_frame = get_latest_frame()
         return latest_frame
@@ -91,18 +349,40 @@ class SceneService:
         if not os.path.exists(self.scenes_dir):
             os.makedirs(self.scenes_dir)
 
+    def _write_scene(self, image: Image.Image, filepath: str):
+        """Write an image to disk as a JPEG scene, through TurboJPEG when it is available."""
+        image_bytes = encode_jpeg(image, quality=SCENE_JPEG_QUALITY)
+        with open(filepath, "wb") as f:
+            f.write(image_bytes)
+
+    def _save_worker(self):
+        """Write queued screenshots to disk and add them to the date index."""
+        while True:
+            image, filepath, timestamp = self._save_queue.get()
+            try:
+                self._write_scene(image, filepath)
+                self._index_scene(filepath, timestamp)
+                logger.info("Screenshot saved to %s.", filepath)
+            except Exception as e:
+                logger.error("Error writing screenshot %s: %s", filepath, e)
+            finally:
+                self._save_queue.task_done()
+
+    def wait_for_saves(self):
+        """Block until every queued screenshot has been written."""
+        self._save_queue.join()
+
     def save_screenshot_from_image(self, image: Image.Image) -> Dict:
         """Save a screenshot from a provided PIL Image."""
-        print("SceneService: Entering save_screenshot_from_image function.")
+        logger.debug("Entering save_screenshot_from_image.")
         try:
             # Create a unique filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"scene_{timestamp}.jpg"
             filepath = os.path.join(self.scenes_dir, filename)
 
-            # Save the provided image
-            image.save(filepath, format="JPEG")
-            print(f"SceneService: Screenshot saved to {filepath}.")
+            # Save the provided image on the save thread, so the caller doesn't wait on the encode and disk
+            self._save_queue.put((image, filepath, timestamp))
 
             return {
                 "status": "success",
@@ -110,39 +390,80 @@ class SceneService:
                 "timestamp": timestamp,
             }
         except Exception as e:
-            print(f"SceneService: Error saving screenshot from image: {e}")
+            logger.error("Error saving screenshot from image: %s", e)
             return {"status": "error", "message": "I couldn't save that screenshot. There might be an issue with the image or storage."}
 
-    def describe_scene_from_image(self, image: Image.Image) -> Dict:
-        """Describe a single scene from a provided PIL Image."""
-        print("SceneService: Entering describe_scene_from_image function.")
-        try:
-            image_bytes = io.BytesIO()
-            image.save(image_bytes, format="PNG")
-            image_bytes = image_bytes.getvalue()
-            print("SceneService: Image converted to bytes for scene description.")
+    def _call_gemini_with_image(self, image: Image.Image, prompt: str, error_message: str) -> Dict:
+        """
+        Ask Gemini about a PIL Image, encoded as JPEG.
 
-            # Now use the bytes with generate_content
-            print("SceneService: Sending scene description request to Gemini.")
+        Args:
+            image (Image.Image): Image to send
+            prompt (str): Instruction or question about the image
+            error_message (str): User-facing message returned if anything fails
+
+        Returns:
+            Dict: Status, markdown-free description and source, or status and error message
+        """
+        try:
+            # JPEG is far smaller and cheaper to encode than PNG for camera frames
+            image_bytes = encode_jpeg(fit_for_gemini(image))
+            logger.debug("Image converted to bytes for Gemini.")
+        except Exception as e:
+            logger.error("Error encoding image for Gemini: %s", e)
+            return {"status": "error", "message": error_message}
+        return self._call_gemini_with_bytes(image_bytes, "image/jpeg", prompt, error_message)
+
+    def _call_gemini_with_bytes(self, image_bytes: bytes, mime_type: str, prompt: str, error_message: str) -> Dict:
+        """
+        Ask Gemini about an already encoded image.
+
+        Args:
+            image_bytes (bytes): Encoded image
+            mime_type (str): MIME type of the encoded image
+            prompt (str): Instruction or question about the image
+            error_message (str): User-facing message returned if the request fails
+
+        Returns:
+            Dict: Status, markdown-free description and source, or status and error message
+        """
+        key = (_content_key(image_bytes), prompt)
+        cached = self._response_get(key)
+        if cached is not None:
+            logger.debug("Returning cached Gemini response.")
+            return cached
+        try:
+            logger.debug("Sending image request to Gemini.")
             response = self.client.models.generate_content(
                 model="gemini-2.0-flash",
                 contents=[
-                    types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
-                    f"Describe what you see in this photo in a natural, conversational way. Focus on the general scene, any people, and what might be happening. Speak as if you're describing it to a friend.",
+                    self._image_part(image_bytes, mime_type),
+                    prompt,
                 ],
             )
-            print(f"SceneService: Received scene description response from Gemini: {response.text[:100]}...")
-            return {
+            logger.debug("Received image response from Gemini: %.100s...", response.text)
+            result = {
                 "status": "success",
                 "description": strip_markdown(response.text),
                 "source": "provided_image",
             }
+            self._response_put(key, result)
+            return result
         except Exception as e:
-            print(f"SceneService: Error describing scene: {e}")
-            return {"status": "error", "message": "I'm having trouble describing what I see in that image. The image might be unclear or there could be a processing issue."}
+            logger.error("Error in Gemini image request: %s", e)
+            return {"status": "error", "message": error_message}
+
+    def describe_scene_from_image(self, image: Image.Image) -> Dict:
+        """Describe a single scene from a provided PIL Image."""
+        logger.debug("Entering describe_scene_from_image.")
+        return self._call_gemini_with_image(image, DESCRIBE_PROMPT, DESCRIBE_ERROR)
+
+    def describe_scene_from_bytes(self, image_bytes: bytes, mime_type: str) -> Dict:
+        """Describe a single scene from already encoded image bytes."""
+        return self._call_gemini_with_bytes(image_bytes, mime_type, DESCRIBE_PROMPT, DESCRIBE_ERROR)
 
     def save_screenshot(self) -> Dict:
-        print("SceneService: Entering save_screenshot function.")
+        logger.debug("Entering save_screenshot.")
         try:
             # Create a unique filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -152,10 +473,10 @@ class SceneService:
             # Get current image and save it
             image = self.get_current_image()
             if image is None:
-                print("SceneService: No image available for saving screenshot.")
+                logger.warning("No image available for saving screenshot.")
                 return {"status": "error", "message": "I don't have a current image to save. Try taking a photo first."}
-            image.save(filepath, format="JPEG")
-            print(f"SceneService: Screenshot saved to {filepath}.")
+            # Written on the save thread so the caller doesn't wait on the encode and disk
+            self._save_queue.put((image, filepath, timestamp))
 
             return {
                 "status": "success",
@@ -163,30 +484,93 @@ class SceneService:
                 "timestamp": timestamp,
             }
         except Exception as e:
-            print(f"SceneService: Error saving screenshot: {e}")
+            logger.error("Error saving screenshot: %s", e)
             return {"status": "error", "message": "I couldn't save that screenshot. There might be an issue with the image or storage."}
 
     def get_daily_scenes(self, date: Optional[str] = None) -> List[str]:
-        print(f"SceneService: Entering get_daily_scenes for date: {date}.")
+        logger.debug("Entering get_daily_scenes for date: %s.", date)
         if date is None:
             date = datetime.now().strftime("%Y%m%d")
-            print(f"SceneService: No date provided, using current date: {date}.")
-
-        scenes = []
-        for filename in os.listdir(self.scenes_dir):
-            if filename.startswith(f"scene_{date}"):
-                scenes.append(os.path.join(self.scenes_dir, filename))
-        print(f"SceneService: Found {len(scenes)} scenes for date {date}.")
+            logger.debug("No date provided, using current date: %s.", date)
+
+        if len(date) == 8:
+            scenes = list(self._get_scene_index().get(date, ()))
+        else:
+            # Partial or unusual dates keep the original prefix match
+            prefix = f"scene_{date}"
+            # scandir yields ready-joined paths and no extra stat per entry
+            with os.scandir(self.scenes_dir) as entries:
+                scenes = [entry.path for entry in entries if entry.name.startswith(prefix)]
+        logger.debug("Found %d scenes for date %s.", len(scenes), date)
         return scenes
 
+    def _get_scene_index(self) -> Dict[str, List[str]]:
+        """
+        Return scene paths grouped by date, scanning the directory only when
+        its modification time shows files were added or removed.
+
+        Returns:
+            Dict[str, List[str]]: Scene file paths keyed by YYYYMMDD
+        """
+        with self._scene_index_lock:
+            mtime = os.stat(self.scenes_dir).st_mtime_ns
+            if self._scene_index is None or mtime != self._scene_index_mtime:
+                index: Dict[str, List[str]] = {}
+                with os.scandir(self.scenes_dir) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("scene_"):
+                            index.setdefault(entry.name[6:14], []).append(entry.path)
+                self._scene_index = index
+                self._scene_index_mtime = mtime
+            return self._scene_index
+
+    def _index_scene(self, filepath: str, timestamp: str):
+        """Add a scene saved by this service to the date index without a rescan."""
+        with self._scene_index_lock:
+            if self._scene_index is None:
+                return
+            scenes = self._scene_index.setdefault(timestamp[:8], [])
+            # Already there if a rescan picked the file up first, or a
+            # screenshot in the same second overwrote it
+            if filepath not in scenes:
+                scenes.append(filepath)
+            self._scene_index_mtime = os.stat(self.scenes_dir).st_mtime_ns
+
+    def _load_scene_part(self, scene_path: str) -> Optional[types.Part]:
+        """Load a saved scene and wrap it as a Gemini Part, or None if it can't be read."""
+        try:
+            # Key uploads of saved scenes by file identity, so a scene already
+            # in the Files API is sent by URI without being read at all
+            st = os.stat(scene_path)
+            key = ("scene", scene_path, st.st_size, st.st_mtime_ns)
+            part = self._uploaded_part(key)
+            if part is not None:
+                return part
+
+            # Scenes are saved as JPEG, which Gemini reads as-is
+            with open(scene_path, "rb") as f:
+                image_bytes = f.read()
+            mime_type = sniff_image_mime(image_bytes)
+            with Image.open(io.BytesIO(image_bytes)) as scene_image:
+                # Opening only reads the header; pixels are decoded just for files that need re-encoding
+                if mime_type is None or max(scene_image.size) > GEMINI_MAX_SIDE:
+                    # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when that still covers the target size
+                    scale = min(1.0, GEMINI_MAX_SIDE / max(scene_image.size))
+                    scene_image.draft("RGB", (math.ceil(scene_image.width * scale), math.ceil(scene_image.height * scale)))
+                    image_bytes, mime_type = encode_jpeg(fit_for_gemini(scene_image)), "image/jpeg"
+            return self._image_part(image_bytes, mime_type, key)
+        except Exception as e:
+            logger.error("Error loading scene %s: %s", scene_path, e)
+            return None
+
     def get_daily_recap(self, date: Optional[str] = None) -> Dict:
         """Get a comprehensive description of all scenes from a specific date."""
-        print(f"SceneService: Entering get_daily_recap for date: {date}.")
+        logger.debug("Entering get_daily_recap for date: %s.", date)
         try:
             # Get scenes from the specified date
             scenes = self.get_daily_scenes(date)
             if not scenes:
-                print(f"SceneService: No scenes found for {date} for daily recap.")
+                logger.info("No scenes found for %s for daily recap.", date)
                 
                 # Parse the date for a natural response
                 try:
@@ -209,7 +593,7 @@ class SceneService:
                         natural_response = "I don't have any photos from today yet. It looks like you haven't taken any pictures with your glasses today."
                         
                 except Exception as e:
-                    print(f"Error parsing date for natural response: {e}")
+                    logger.warning("Error parsing date for natural response: %s", e)
                     natural_response = "I don't have any photos from that day. It seems like no pictures were taken or saved on that date."
                 
                 return {
@@ -220,70 +604,46 @@ class SceneService:
                     "scene_count": 0,
                 }
 
+            # A day's recap only changes when its photos do
+            recap_key = self._scene_set_key(scenes)
+            cached = self._response_get(recap_key) if recap_key is not None else None
+            if cached is not None:
+                logger.debug("Returning cached daily recap for %s.", date)
+                return cached
+
             # Load all scene images and prepare them for Gemini
             scene_images = []
             scene_descriptions = []
             timestamps = []
             
-            for i, scene_path in enumerate(scenes):
-                try:
-                    # Load the image
-                    scene_image = Image.open(scene_path)
-                    
-                    # Convert to bytes for Gemini
-                    image_bytes = io.BytesIO()
-                    scene_image.save(image_bytes, format="PNG")
-                    image_bytes = image_bytes.getvalue()
-                    
-                    # Add to the list of images
-                    scene_images.append(types.Part.from_bytes(data=image_bytes, mime_type="image/png"))
-                    
-                    # Get timestamp from filename for context
-                    filename = os.path.basename(scene_path)
-                    timestamp_str = filename.replace("scene_", "").replace(".jpg", "")
-                    
-                    # Parse timestamp for better formatting
-                    try:
-                        # Format: YYYYMMDD_HHMMSS
-                        date_part = timestamp_str[:8]
-                        time_part = timestamp_str[9:]
-                        
-                        # Convert to readable format
-                        year = date_part[:4]
-                        month = date_part[4:6]
-                        day = date_part[6:8]
-                        hour = time_part[:2]
-                        minute = time_part[2:4]
-                        second = time_part[4:6]
-                        
-                        # Create readable timestamp
-                        readable_time = f"{hour}:{minute}:{second}"
-                        readable_date = f"{year}-{month}-{day}"
-                        
-                        timestamps.append({
-                            "index": i + 1,
-                            "time": readable_time,
-                            "date": readable_date,
-                            "raw": timestamp_str
-                        })
-                        
-                        scene_descriptions.append(f"Photo {i+1} taken at {readable_time if 'readable_time' in locals() else 'unknown time'}")
-                        
-                    except Exception as e:
-                        print(f"Error parsing timestamp {timestamp_str}: {e}")
-                        timestamps.append({
-                            "index": i + 1,
-                            "time": "unknown",
-                            "date": "unknown",
-                            "raw": timestamp_str
-                        })
-                        scene_descriptions.append(f"Photo {i+1}")
-                    
-                    print(f"SceneService: Loaded scene {i+1}: {filename} at {readable_time if 'readable_time' in locals() else 'unknown time'}")
-                    
-                except Exception as e:
-                    print(f"SceneService: Error loading scene {scene_path}: {e}")
+            # Timestamps come from the filenames alone, so parse them before loading
+            filenames = [os.path.basename(scene_path) for scene_path in scenes]
+            parsed_timestamps = [_parse_scene_ts(filename) for filename in filenames]
+
+            # Disk reads and encodes are independent, so run them all at once
+            scene_parts = list(_scene_pool.map(self._load_scene_part, scenes))
+
+            for i, (filename, scene_part, parsed) in enumerate(zip(filenames, scene_parts, parsed_timestamps)):
+                if scene_part is None:
                     continue
+                scene_images.append(scene_part)
+                timestamp_str = filename.replace("scene_", "").replace(".jpg", "")
+
+                if parsed is None:
+                    logger.warning("Error parsing timestamp %s", timestamp_str)
+                    readable_time, readable_date = "unknown", "unknown"
+                    scene_descriptions.append(f"Photo {i+1}")
+                else:
+                    readable_time, readable_date = parsed
+                    scene_descriptions.append(f"Photo {i+1} taken at {readable_time}")
+
+                timestamps.append({
+                    "index": i + 1,
+                    "time": readable_time,
+                    "date": readable_date,
+                    "raw": timestamp_str
+                })
+                logger.debug("Loaded scene %d: %s at %s", i + 1, filename, readable_time)
 
             if not scene_images:
                 return {
@@ -315,7 +675,7 @@ Avoid detailed technical analysis of the images. Instead, focus on the human sto
 Please provide a warm, conversational summary of their day's activities, incorporating the specific times when they took these photos."""
 
             # Send all images and prompt to Gemini
-            print(f"SceneService: Sending {len(scene_images)} scenes to Gemini for daily recap.")
+            logger.debug("Sending %d scenes to Gemini for daily recap.", len(scene_images))
             
             # Prepare content with all images and the prompt
             content = scene_images + [prompt]
@@ -325,77 +685,34 @@ Please provide a warm, conversational summary of their day's activities, incorpo
                 contents=content
             )
             
-            print(f"SceneService: Received daily recap response from Gemini: {response.text[:100]}...")
-            return {
+            logger.debug("Received daily recap response from Gemini: %.100s...", response.text)
+            result = {
                 "status": "success",
                 "description": strip_markdown(response.text),
                 "source": "daily_recap",
                 "scenes_used": scenes,
                 "scene_count": len(scene_images),
             }
+            if recap_key is not None:
+                self._response_put(recap_key, result)
+            return result
         except Exception as e:
-            print(f"SceneService: Error getting daily recap: {e}")
+            logger.error("Error getting daily recap: %s", e)
             return {"status": "error", "message": "I'm having trouble creating your daily recap right now. This might be a temporary issue with the photo processing or storage. You could try again in a moment."}
 
     def answer_image_query(self, query: str) -> Dict:
-        print(f"SceneService: Entering answer_image_query with query: {query}.")
-        try:
-            image = self.get_current_image()  # This returns a PIL Image
-            if image is None:
-                print("SceneService: No image available for image query.")
-                return {"status": "error", "message": "I don't have a current image to analyze. Try taking a photo first."}
-            image_bytes = io.BytesIO()
-            image.save(image_bytes, format="PNG")
-            image_bytes = image_bytes.getvalue()  # Get the bytes data
-            print("SceneService: Image converted to bytes for Gemini.")
-
-            # Now use the bytes with generate_content
-            print("SceneService: Sending image query to Gemini.")
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=[
-                    types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
-                    query,
-                ],
-            )
-            print(f"SceneService: Received image query response from Gemini: {response.text[:100]}...")
-            return {
-                "status": "success",
-                "description": strip_markdown(response.text),
-                "source": "provided_image",
-            }
-        except Exception as e:
-            print(f"SceneService: Error answering image query: {e}")
-            return {"status": "error", "message": "I'm having trouble analyzing that image right now. The image might be unclear or there could be a processing issue."}
+        logger.debug("Entering answer_image_query with query: %s.", query)
+        image = self.get_current_image()  # This returns a PIL Image
+        if image is None:
+            logger.warning("No image available for image query.")
+            return {"status": "error", "message": "I don't have a current image to analyze. Try taking a photo first."}
+        return self._call_gemini_with_image(image, query, QUERY_ERROR)
 
     def describe_scene(self) -> Dict:
         """Describe a single scene from the provided image URL."""
-        print("SceneService: Entering describe_scene function.")
-        try:
-            image = self.get_current_image()  # This returns a PIL Image
-            if image is None:
-                print("SceneService: No image available to describe scene.")
-                return {"status": "error", "message": "I don't have a current image to describe. Try taking a photo first."}
-            image_bytes = io.BytesIO()
-            image.save(image_bytes, format="PNG")
-            image_bytes = image_bytes.getvalue()  # Get the bytes data
-            print("SceneService: Image converted to bytes for scene description.")
-
-            # Now use the bytes with generate_content
-            print("SceneService: Sending scene description request to Gemini.")
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=[
-                    types.Part.from_bytes(data=image_bytes, mime_type="image/png"),
-                    f"Describe what you see in this photo in a natural, conversational way. Focus on the general scene, any people, and what might be happening. Speak as if you're describing it to a friend.",
-                ],
-            )
-            print(f"SceneService: Received scene description response from Gemini: {response.text[:100]}...")
-            return {
-                "status": "success",
-                "description": strip_markdown(response.text),
-                "source": "provided_image",
-            }
-        except Exception as e:
-            print(f"SceneService: Error describing scene: {e}")
-            return {"status": "error", "message": "I'm having trouble describing what I see in that image. The image might be unclear or there could be a processing issue."}
+        logger.debug("Entering describe_scene.")
+        image = self.get_current_image()  # This returns a PIL Image
+        if image is None:
+            logger.warning("No image available to describe scene.")
+            return {"status": "error", "message": "I don't have a current image to describe. Try taking a photo first."}
+        return self._call_gemini_with_image(image, DESCRIBE_PROMPT, DESCRIBE_ERROR)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Unit tests for fetching frames from the camera, with the camera request stubbed out
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import io
+
+import pytest
+from PIL import Image
+
+import camera_service
+
+class FakeCaptureResponse:
+    """Minimal stand-in for a streamed requests.Response carrying a JPEG"""
+
+    def __init__(self, body: bytes, content_length: bool = True):
+        self.status_code = 200
+        self.headers = {"Content-Length": str(len(body))} if content_length else {}
+        self.raw = io.BytesIO(body)
+        self.content = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def make_jpeg(size=(64, 48)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, (90, 140, 200)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_fetch_frame_returns_image(monkeypatch, content_length):
+    """A 200 capture decodes to an enhanced frame, with or without Content-Length"""
+    body = make_jpeg()
+    monkeypatch.setattr(camera_service._session, "get",
+                        lambda *args, **kwargs: FakeCaptureResponse(body, content_length))
+
+    frame = camera_service._fetch_frame()
+
+    assert isinstance(frame, Image.Image)
+    assert frame.size == (64, 48)
+    assert frame.mode == "RGB"
+
+def test_fetch_frame_truncated_body_returns_none(monkeypatch):
+    """A body shorter than its Content-Length is treated as a failed fetch"""
+    response = FakeCaptureResponse(make_jpeg())
+    response.headers["Content-Length"] = str(len(response.content) + 100)
+    monkeypatch.setattr(camera_service._session, "get", lambda *args, **kwargs: response)
+
+    assert camera_service._fetch_frame() is None
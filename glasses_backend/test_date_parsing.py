@@ -5,133 +5,45 @@ Test script to verify natural language date parsing functionality
 
 import sys
 import os
+import time
+import functools
+import multiprocessing
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from datetime import datetime, timedelta
-from dateutil import parser, relativedelta
-import re
 
-def parse_natural_language_date(query: str) -> str:
-    """
-    Parse natural language date expressions and return YYYYMMDD format.
-    
-    Examples:
-    - "Recap my day so far" -> today
-    - "Give me a recap of what my day was like yesterday" -> yesterday
-    - "I need to know what I did two weeks ago" -> two weeks ago
-    - "What happened on the 6th of June?" -> June 6th of current year
-    - "What happened last Monday?" -> last Monday
-    """
-    query_lower = query.lower().strip()
-    
-    # Handle relative dates
-    if any(phrase in query_lower for phrase in ["today", "my day so far", "this day", "current day"]):
-        return datetime.now().strftime("%Y%m%d")
-    
-    if any(phrase in query_lower for phrase in ["yesterday", "yesterdays"]):
-        yesterday = datetime.now() - timedelta(days=1)
-        return yesterday.strftime("%Y%m%d")
-    
-    if any(phrase in query_lower for phrase in ["tomorrow", "tomorrows"]):
-        tomorrow = datetime.now() + timedelta(days=1)
-        return tomorrow.strftime("%Y%m%d")
-    
-    # Handle "X days ago"
-    days_ago_match = re.search(r'(\d+)\s+days?\s+ago', query_lower)
-    if days_ago_match:
-        days = int(days_ago_match.group(1))
-        target_date = datetime.now() - timedelta(days=days)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "X weeks ago"
-    weeks_ago_match = re.search(r'(\d+)\s+weeks?\s+ago', query_lower)
-    if weeks_ago_match:
-        weeks = int(weeks_ago_match.group(1))
-        target_date = datetime.now() - timedelta(weeks=weeks)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "X months ago"
-    months_ago_match = re.search(r'(\d+)\s+months?\s+ago', query_lower)
-    if months_ago_match:
-        months = int(months_ago_match.group(1))
-        target_date = datetime.now() - relativedelta.relativedelta(months=months)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "X years ago"
-    years_ago_match = re.search(r'(\d+)\s+years?\s+ago', query_lower)
-    if years_ago_match:
-        years = int(years_ago_match.group(1))
-        target_date = datetime.now() - relativedelta.relativedelta(years=years)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle "last week", "last month", etc.
-    if "last week" in query_lower:
-        target_date = datetime.now() - timedelta(weeks=1)
-        return target_date.strftime("%Y%m%d")
-    
-    if "last month" in query_lower:
-        target_date = datetime.now() - relativedelta.relativedelta(months=1)
-        return target_date.strftime("%Y%m%d")
-    
-    if "last year" in query_lower:
-        target_date = datetime.now() - relativedelta.relativedelta(years=1)
-        return target_date.strftime("%Y%m%d")
-    
-    # Handle specific weekdays
-    weekdays = {
-        "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-        "friday": 4, "saturday": 5, "sunday": 6
-    }
-    
-    for day_name, day_num in weekdays.items():
-        if f"last {day_name}" in query_lower:
-            today = datetime.now()
-            days_since = (today.weekday() - day_num) % 7
-            if days_since == 0:
-                days_since = 7  # Last week's same day
-            target_date = today - timedelta(days=days_since)
-            return target_date.strftime("%Y%m%d")
-    
-    # Handle absolute dates like "6th of June", "June 6th"
-    try:
-        # Try to parse with dateutil
-        parsed_date = parser.parse(query, fuzzy=True)
-        return parsed_date.strftime("%Y%m%d")
-    except:
-        pass
-    
-    # If all else fails, return today's date
-    print(f"Could not parse date from query: '{query}', defaulting to today")
-    return datetime.now().strftime("%Y%m%d")
+from date_parsing import parse_natural_language_date
+
+# Sample recap queries covering the date expressions the parser handles
+TEST_QUERIES = [
+    "Recap my day so far",
+    "Give me a recap of what my day was like yesterday",
+    "I need to know what I did two weeks ago",
+    "What happened on the 6th of June?",
+    "What happened last Monday?",
+    "Show me what I did 3 days ago",
+    "Tell me about my activities last month",
+    "What did I do last year?",
+    "Recap yesterday's activities",
+    "What happened today?",
+    "Show me last Friday's recap",
+    "What did I do 5 weeks ago?",
+    "Tell me about June 15th",
+    "What happened on the 1st of January?",
+    "Show me last week's activities",
+]
 
 def test_date_parsing():
     """Test various date parsing scenarios"""
     print("=== Natural Language Date Parsing Test ===\n")
     
-    test_cases = [
-        "Recap my day so far",
-        "Give me a recap of what my day was like yesterday",
-        "I need to know what I did two weeks ago",
-        "What happened on the 6th of June?",
-        "What happened last Monday?",
-        "Show me what I did 3 days ago",
-        "Tell me about my activities last month",
-        "What did I do last year?",
-        "Recap yesterday's activities",
-        "What happened today?",
-        "Show me last Friday's recap",
-        "What did I do 5 weeks ago?",
-        "Tell me about June 15th",
-        "What happened on the 1st of January?",
-        "Show me last week's activities",
-    ]
-    
     today = datetime.now()
     print(f"Current date: {today.strftime('%Y-%m-%d (%A)')}\n")
     
-    for i, query in enumerate(test_cases, 1):
+    for i, query in enumerate(TEST_QUERIES, 1):
         try:
-            parsed_date = parse_natural_language_date(query)
+            # Same reference time for every query, so a run can't straddle midnight
+            parsed_date = parse_natural_language_date(query, now=today)
             parsed_datetime = datetime.strptime(parsed_date, "%Y%m%d")
             
             print(f"{i:2d}. Query: '{query}'")
@@ -157,5 +69,37 @@ def test_date_parsing():
             print(f"    Error: {e}")
             print()
 
+def benchmark_date_parsing(copies: int = 1000, chunksize: int = 64):
+    """
+    Time the parser over the sample queries repeated many times, first in this
+    process and then spread over every core with a process pool.
+
+    Args:
+        copies (int): How many times to repeat TEST_QUERIES
+        chunksize (int): Queries sent to a worker per task
+    """
+    # Show the results so far before the slow part starts
+    print("\n=== Date Parsing Benchmark ===\n", flush=True)
+    queries = TEST_QUERIES * copies
+    parse = functools.partial(parse_natural_language_date, now=datetime.now())
+
+    start = time.perf_counter()
+    expected = list(map(parse, queries))
+    sequential = time.perf_counter() - start
+    print(f"Sequential:  {len(queries) / sequential:10.0f} queries/s "
+          f"({sequential / len(queries) * 1e6:.1f} us per call)")
+
+    workers = os.cpu_count() or 1
+    with multiprocessing.Pool(workers) as pool:
+        start = time.perf_counter()
+        results = pool.map(parse, queries, chunksize=chunksize)
+        parallel = time.perf_counter() - start
+    print(f"{workers} processes: {len(queries) / parallel:10.0f} queries/s")
+
+    assert results == expected, "Process pool results differ from sequential parsing"
+
 if __name__ == "__main__":
-    test_date_parsing() 
\ No newline at end of file
+    # Nothing here waits on the network, so block-buffer the report even on a terminal
+    sys.stdout.reconfigure(line_buffering=False)
+    test_date_parsing()
+    benchmark_date_parsing() 
\ No newline at end of file
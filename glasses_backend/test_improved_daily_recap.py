@@ -7,6 +7,8 @@ import requests
 import json
 from datetime import datetime
 
+from scene_service import _parse_scene_ts
+
 def test_improved_daily_recap():
     """Test the improved daily recap functionality"""
     print("=== Improved Daily Recap Test ===\n")
@@ -94,27 +96,13 @@ def test_timestamp_parsing():
     
     print("Testing timestamp parsing:")
     for timestamp in test_timestamps:
-        try:
-            # Parse timestamp for better formatting
-            date_part = timestamp[:8]
-            time_part = timestamp[9:]
-            
-            # Convert to readable format
-            year = date_part[:4]
-            month = date_part[4:6]
-            day = date_part[6:8]
-            hour = time_part[:2]
-            minute = time_part[2:4]
-            second = time_part[4:6]
-            
-            # Create readable timestamp
-            readable_time = f"{hour}:{minute}:{second}"
-            readable_date = f"{year}-{month}-{day}"
-            
-            print(f"  {timestamp} → {readable_date} at {readable_time}")
-            
-        except Exception as e:
-            print(f"  {timestamp} → Error: {e}")
+        # Same parser the recap endpoint uses for scene filenames
+        parsed = _parse_scene_ts(f"scene_{timestamp}.jpg")
+        if parsed is None:
+            print(f"  {timestamp} → Error: not a YYYYMMDD_HHMMSS timestamp")
+            continue
+        readable_time, readable_date = parsed
+        print(f"  {timestamp} → {readable_date} at {readable_time}")
 
 if __name__ == "__main__":
     test_improved_daily_recap()
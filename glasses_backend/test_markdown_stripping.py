@@ -7,66 +7,38 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import pytest
+
 from scene_service import strip_markdown
 
+# (input, expected) pairs, shared by the pytest suite and the script runner
+TEST_CASES = [
+    ("# Header\nThis is **bold** text and *italic* text.", "Header\nThis is bold text and italic text."),
+    ("Here's a `code snippet` and a [link](http://example.com).", "Here's a code snippet and a link."),
+    ("**Bold text** with __more bold__ and *italic* with _more italic_.", "Bold text with more bold and italic with more italic."),
+    ("```\ncode block\n```\nRegular text.", "Regular text."),
+    ("- List item 1\n- List item 2\n1. Numbered item", "List item 1\nList item 2\nNumbered item"),
+    ("> Blockquote text\nRegular text after.", "Blockquote text\nRegular text after."),
+    ("---\nHorizontal rule above\n***\nAnother rule", "Horizontal rule above\nAnother rule"),
+    ("**Complex** example with `inline code`, [links](url), and\n- Lists\n- Items", "Complex example with inline code, links, and\nLists\nItems"),
+    ("No markdown here, just plain text.", "No markdown here, just plain text."),
+    ("", ""),
+    (None, None),
+]
+
+@pytest.mark.parametrize("input_text,expected", TEST_CASES)
+def test_strip_markdown_case(input_text, expected):
+    """Each example strips to exactly the expected text"""
+    assert strip_markdown(input_text) == expected
+
 def test_markdown_stripping():
     """Test the markdown stripping function with various examples"""
     print("=== Markdown Stripping Test ===\n")
     
-    test_cases = [
-        {
-            "input": "# Header\nThis is **bold** text and *italic* text.",
-            "expected": "Header\nThis is bold text and italic text."
-        },
-        {
-            "input": "Here's a `code snippet` and a [link](http://example.com).",
-            "expected": "Here's a code snippet and a link."
-        },
-        {
-            "input": "**Bold text** with __more bold__ and *italic* with _more italic_.",
-            "expected": "Bold text with more bold and italic with more italic."
-        },
-        {
-            "input": "```\ncode block\n```\nRegular text.",
-            "expected": "Regular text."
-        },
-        {
-            "input": "- List item 1\n- List item 2\n1. Numbered item",
-            "expected": "List item 1\nList item 2\nNumbered item"
-        },
-        {
-            "input": "> Blockquote text\nRegular text after.",
-            "expected": "Blockquote text\nRegular text after."
-        },
-        {
-            "input": "---\nHorizontal rule above\n***\nAnother rule",
-            "expected": "Horizontal rule above\nAnother rule"
-        },
-        {
-            "input": "**Complex** example with `inline code`, [links](url), and\n- Lists\n- Items",
-            "expected": "Complex example with inline code, links, and\nLists\nItems"
-        },
-        {
-            "input": "No markdown here, just plain text.",
-            "expected": "No markdown here, just plain text."
-        },
-        {
-            "input": "",
-            "expected": ""
-        },
-        {
-            "input": None,
-            "expected": None
-        }
-    ]
-    
     passed = 0
-    total = len(test_cases)
+    total = len(TEST_CASES)
     
-    for i, test_case in enumerate(test_cases, 1):
-        input_text = test_case["input"]
-        expected = test_case["expected"]
-        
+    for i, (input_text, expected) in enumerate(TEST_CASES, 1):
         try:
             result = strip_markdown(input_text)
             
@@ -111,5 +83,7 @@ def test_real_world_examples():
         print()
 
 if __name__ == "__main__":
+    # Nothing here waits on the network, so block-buffer the report even on a terminal
+    sys.stdout.reconfigure(line_buffering=False)
     test_markdown_stripping()
     test_real_world_examples() 
\ No newline at end of file
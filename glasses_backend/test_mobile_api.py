@@ -3,120 +3,160 @@
 Test script for the mobile-first API endpoints
 """
 
-import requests
+import asyncio
+import httpx
 import base64
+import functools
 import json
+try:
+    # C JSON encoder/decoder; the request bodies carry a multi-hundred-KB base64 image
+    import orjson
+except ImportError:
+    orjson = None
+import pathlib
 from PIL import Image
 import io
 
+# Manual script against a running backend, not a pytest module
+__test__ = False
+
 # Configuration
 API_BASE_URL = "http://localhost:8000"  # Change this to your backend URL
 TEST_IMAGE_PATH = "frame_20250506_085146.jpg"  # Use an existing test image
+# Every test waits on the network, so they all run at once; this bounds a slow backend
+REQUEST_TIMEOUT = 120.0
+
+@functools.lru_cache(maxsize=1)
+def image_to_bytes(image_path: str) -> bytes:
+    """Read an image file once per run, for the raw multipart upload endpoints"""
+    return pathlib.Path(image_path).read_bytes()
 
+@functools.lru_cache(maxsize=1)
 def image_to_base64(image_path: str) -> str:
-    """Convert image file to base64 string"""
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
+    """Convert image file to base64 string, encoding each file only once per run"""
+    return base64.b64encode(image_to_bytes(image_path)).decode('ascii')
+
+def post_json(client: httpx.AsyncClient, path: str, payload: dict):
+    """POST a JSON body, encoded straight to bytes with orjson when it is installed"""
+    if orjson is None:
+        return client.post(path, json=payload)
+    return client.post(path, content=orjson.dumps(payload), headers={"Content-Type": "application/json"})
+
+def parse_json(response: httpx.Response):
+    """Decode a JSON response body, with orjson when it is installed"""
+    if orjson is None:
+        return response.json()
+    return orjson.loads(response.content)
+
+# Each test prints its whole report after its request finishes, so reports from
+# concurrently running tests never interleave
 
-def test_query_with_image():
+async def test_query_with_image(client: httpx.AsyncClient):
     """Test the /query endpoint with image"""
-    print("Testing /query endpoint with image...")
-    
     try:
         # Convert test image to base64
         image_base64 = image_to_base64(TEST_IMAGE_PATH)
-        
+
         # Test query that requires image
         query_data = {
             "query": "What do you see in this image?",
             "image": image_base64
         }
-        
-        response = requests.post(f"{API_BASE_URL}/query", json=query_data)
+
+        response = await post_json(client, "/query", query_data)
+        print("\nTesting /query endpoint with image...")
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
+        print(f"Response: {json.dumps(parse_json(response), indent=2)}")
+
     except Exception as e:
-        print(f"Error testing query with image: {e}")
+        print(f"\nError testing query with image: {e}")
 
-def test_query_without_image():
+async def test_query_without_image(client: httpx.AsyncClient):
     """Test the /query endpoint without image"""
-    print("\nTesting /query endpoint without image...")
-    
     try:
         # Test query that doesn't require image
         query_data = {
             "query": "Hello, how are you?"
         }
-        
-        response = requests.post(f"{API_BASE_URL}/query", json=query_data)
+
+        response = await post_json(client, "/query", query_data)
+        print("\nTesting /query endpoint without image...")
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
+        print(f"Response: {json.dumps(parse_json(response), indent=2)}")
+
     except Exception as e:
-        print(f"Error testing query without image: {e}")
+        print(f"\nError testing query without image: {e}")
 
-def test_extract_text():
+async def test_extract_text(client: httpx.AsyncClient):
     """Test the /extract_text endpoint"""
-    print("\nTesting /extract_text endpoint...")
-    
     try:
         # Convert test image to base64
         image_base64 = image_to_base64(TEST_IMAGE_PATH)
-        
+
         request_data = {
             "image": image_base64
         }
-        
-        response = requests.post(f"{API_BASE_URL}/extract_text", json=request_data)
+
+        response = await post_json(client, "/extract_text", request_data)
+        print("\nTesting /extract_text endpoint...")
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
+        print(f"Response: {json.dumps(parse_json(response), indent=2)}")
+
     except Exception as e:
-        print(f"Error testing extract_text: {e}")
+        print(f"\nError testing extract_text: {e}")
 
-def test_describe_scene():
+async def test_describe_scene(client: httpx.AsyncClient):
     """Test the /describe_scene endpoint"""
-    print("\nTesting /describe_scene endpoint...")
-    
     try:
         # Convert test image to base64
         image_base64 = image_to_base64(TEST_IMAGE_PATH)
-        
+
         request_data = {
             "image": image_base64
         }
-        
-        response = requests.post(f"{API_BASE_URL}/describe_scene", json=request_data)
+
+        response = await post_json(client, "/describe_scene", request_data)
+        print("\nTesting /describe_scene endpoint...")
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
+        print(f"Response: {json.dumps(parse_json(response), indent=2)}")
+
     except Exception as e:
-        print(f"Error testing describe_scene: {e}")
+        print(f"\nError testing describe_scene: {e}")
 
-def test_save_screenshot():
+async def test_upload_endpoint(client: httpx.AsyncClient, endpoint: str):
+    """Test a multipart endpoint such as /extract_text_upload or /describe_scene_upload"""
+    try:
+        # Raw JPEG bytes, a third smaller on the wire than base64 in JSON
+        files = {"image": (TEST_IMAGE_PATH, image_to_bytes(TEST_IMAGE_PATH), "image/jpeg")}
+
+        response = await client.post(f"/{endpoint}", files=files)
+        print(f"\nTesting /{endpoint} endpoint...")
+        print(f"Status Code: {response.status_code}")
+        print(f"Response: {json.dumps(parse_json(response), indent=2)}")
+
+    except Exception as e:
+        print(f"\nError testing {endpoint}: {e}")
+
+async def test_save_screenshot(client: httpx.AsyncClient):
     """Test the /save_screenshot endpoint"""
-    print("\nTesting /save_screenshot endpoint...")
-    
     try:
         # Convert test image to base64
         image_base64 = image_to_base64(TEST_IMAGE_PATH)
-        
+
         request_data = {
             "image": image_base64
         }
-        
-        response = requests.post(f"{API_BASE_URL}/save_screenshot", json=request_data)
+
+        response = await post_json(client, "/save_screenshot", request_data)
+        print("\nTesting /save_screenshot endpoint...")
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        
+        print(f"Response: {json.dumps(parse_json(response), indent=2)}")
+
     except Exception as e:
-        print(f"Error testing save_screenshot: {e}")
+        print(f"\nError testing save_screenshot: {e}")
 
-def test_requires_image_detection():
+async def test_requires_image_detection(client: httpx.AsyncClient):
     """Test the intelligent image requirement detection"""
-    print("\nTesting image requirement detection...")
-    
     test_queries = [
         "What do you see?",
         "Read the text in this image",
@@ -126,29 +166,45 @@ def test_requires_image_detection():
         "Describe this scene",
         "Save this screenshot"
     ]
-    
-    for query in test_queries:
+
+    # Send every probe at once; results are still reported in query order
+    responses = await asyncio.gather(
+        *(post_json(client, "/query", {"query": query}) for query in test_queries),
+        return_exceptions=True,
+    )
+    print("\nTesting image requirement detection...")
+    for query, response in zip(test_queries, responses):
         try:
-            response = requests.post(f"{API_BASE_URL}/query", json={"query": query})
-            result = response.json()
-            
+            if isinstance(response, Exception):
+                raise response
+            result = parse_json(response)
+
             if result.get("requires_image"):
                 print(f"✓ '{query}' - Requires image")
             else:
                 print(f"✗ '{query}' - No image required")
-                
+
         except Exception as e:
             print(f"Error testing query '{query}': {e}")
 
+async def run_all_tests():
+    """Run every test concurrently over one shared keep-alive client"""
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=REQUEST_TIMEOUT) as client:
+        await asyncio.gather(
+            test_query_with_image(client),
+            test_query_without_image(client),
+            test_extract_text(client),
+            test_describe_scene(client),
+            test_upload_endpoint(client, "extract_text_upload"),
+            test_upload_endpoint(client, "describe_scene_upload"),
+            test_save_screenshot(client),
+            test_requires_image_detection(client),
+        )
+
 if __name__ == "__main__":
-    print("=== Mobile-First API Test Suite ===\n")
-    
+    print("=== Mobile-First API Test Suite ===")
+
     # Run all tests
-    test_query_with_image()
-    test_query_without_image()
-    test_extract_text()
-    test_describe_scene()
-    test_save_screenshot()
-    test_requires_image_detection()
-    
-    print("\n=== Test Suite Complete ===") 
\ No newline at end of file
+    asyncio.run(run_all_tests())
+
+    print("\n=== Test Suite Complete ===")
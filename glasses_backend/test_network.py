@@ -3,90 +3,345 @@
 Network connectivity test for camera
 """
 
-import requests
+import asyncio
+import errno
+import functools
+import httpx
+import os
+import re
+import selectors
 import socket
+import struct
 import subprocess
+import sys
 import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
-def test_camera_connectivity():
-    """Test camera connectivity from different perspectives"""
-    camera_ip = "192.168.0.179"
-    camera_url = f"http://{camera_ip}/capture"
-    
-    print("=== Network Connectivity Test ===\n")
-    
-    # Test 1: Basic ping
-    print("1. Testing basic network connectivity...")
+# Platform-specific commands, fixed for the life of the process
+_IS_WINDOWS = platform.system() == "Windows"
+_IS_LINUX = platform.system() == "Linux"
+_PING_CMD = ["ping", "-n", "1"] if _IS_WINDOWS else ["ping", "-c", "1"]
+_IFACE_CMD = ["ipconfig"] if _IS_WINDOWS else ["ifconfig"]
+# Linux ioctls returning an interface's IPv4 address and netmask as a struct ifreq
+_SIOCGIFADDR = 0x8915
+_SIOCGIFNETMASK = 0x891B
+
+# A LAN camera accepts a connection within milliseconds; the margin covers WiFi power-save wake-up
+CONNECT_TIMEOUT = 1.0
+
+# Fail fast if a camera doesn't accept the connection, but give a slow frame time to arrive
+HTTP_TIMEOUT = httpx.Timeout(5.0, connect=CONNECT_TIMEOUT)
+# Most cameras probed at once over one client's keep-alive pool
+HTTP_MAX_CONNECTIONS = 8
+
+# Camera under test; CAMERA_IP may also be a hostname, resolved once per run
+CAMERA_IP = os.getenv("CAMERA_IP", "192.168.0.179")
+CAMERA_URL = f"http://{CAMERA_IP}/capture"
+
+@functools.lru_cache(maxsize=1)
+def _camera_address() -> str:
+    """The camera's IPv4 address, looking a hostname up only the first time."""
+    return socket.getaddrinfo(CAMERA_IP, 80, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+
+def _icmp_checksum(packet: bytes) -> int:
+    """RFC 1071 ones' complement checksum of an ICMP packet."""
+    if len(packet) % 2:
+        packet += b"\0"
+    total = sum(struct.unpack(f"!{len(packet) // 2}H", packet))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+def _open_icmp_socket() -> socket.socket:
+    """
+    Open an unprivileged ICMP echo socket (Linux and macOS).
+
+    Raises:
+        OSError: If the platform or net.ipv4.ping_group_range doesn't allow it
+    """
+    return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+
+def _icmp_echo(sock: socket.socket, ip: str, timeout: float = 1.0) -> float:
+    """
+    Send one ICMP echo request and wait for the reply.
+
+    Returns:
+        float: Round-trip time in seconds
+
+    Raises:
+        OSError: If no reply arrives within timeout
+    """
+    ident, seq = os.getpid() & 0xFFFF, 1
+    header = struct.pack("!BBHHH", 8, 0, 0, ident, seq)
+    payload = b"glasses-ping"
+    packet = struct.pack("!BBHHH", 8, 0, _icmp_checksum(header + payload), ident, seq) + payload
+
+    sock.settimeout(timeout)
+    start = time.perf_counter()
+    sock.sendto(packet, (ip, 0))
+    deadline = start + timeout
+    while True:
+        reply, _ = sock.recvfrom(1024)
+        # Linux hands back the bare ICMP message, macOS keeps the IPv4 header in front
+        if reply and reply[0] >> 4 == 4:
+            reply = reply[(reply[0] & 0x0F) * 4:]
+        # The kernel rewrites the identifier, so match on type and sequence only
+        if len(reply) >= 8 and reply[0] == 0 and struct.unpack("!H", reply[6:8])[0] == seq:
+            return time.perf_counter() - start
+        sock.settimeout(max(deadline - time.perf_counter(), 0.001))
+
+def _tcp_probes(ips: List[str], port: int = 80,
+                timeout: float = CONNECT_TIMEOUT) -> Dict[str, Union[float, OSError]]:
+    """
+    Connect to port on several hosts at once from one thread, waiting on a
+    selector (epoll on Linux) for the non-blocking connects to finish.
+
+    Args:
+        ips (List[str]): IPv4 addresses to probe
+        port (int): TCP port to connect to
+        timeout (float): Seconds to wait for all connects together
+
+    Returns:
+        Dict[str, Union[float, OSError]]: For each IP, the connect time in
+            seconds or the error that stopped it
+    """
+    results: Dict[str, Union[float, OSError]] = {}
+    with selectors.DefaultSelector() as selector:
+        start = time.perf_counter()
+        for ip in ips:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            err = sock.connect_ex((ip, port))
+            if err in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                selector.register(sock, selectors.EVENT_WRITE, ip)
+            else:
+                results[ip] = OSError(err, os.strerror(err))
+                sock.close()
+
+        deadline = start + timeout
+        while selector.get_map():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                # Writable means the handshake finished; SO_ERROR says whether it succeeded
+                err = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                results[key.data] = time.perf_counter() - start if err == 0 else OSError(err, os.strerror(err))
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+
+        # Whatever is still registered never finished connecting
+        for key in list(selector.get_map().values()):
+            results[key.data] = socket.timeout("timed out")
+            selector.unregister(key.fileobj)
+            key.fileobj.close()
+    return results
+
+def _tcp_probe(ip: str, port: int = 80, timeout: float = CONNECT_TIMEOUT) -> float:
+    """
+    Open and close one TCP connection to ip:port.
+
+    Returns:
+        float: Connect time in seconds
+
+    Raises:
+        OSError: If the connection is refused or times out
+    """
+    result = _tcp_probes([ip], port, timeout)[ip]
+    if isinstance(result, OSError):
+        raise result
+    return result
+
+def _ping(camera_ip):
+    """Test 1: basic ping. Returns the report lines."""
+    lines = ["1. Testing basic network connectivity..."]
     try:
-        if platform.system() == "Windows":
-            result = subprocess.run(["ping", "-n", "1", camera_ip], capture_output=True, text=True)
-        else:
-            result = subprocess.run(["ping", "-c", "1", camera_ip], capture_output=True, text=True)
-        
+        sock = _open_icmp_socket()
+    except OSError:
+        sock = None
+    if sock is not None:
+        # Echo straight from this process, no ping subprocess to fork
+        with sock:
+            try:
+                rtt = _icmp_echo(sock, camera_ip)
+                lines.append(f"   ✓ Ping successful ({rtt * 1000:.1f} ms)")
+            except OSError as e:
+                lines.append(f"   ✗ Ping failed: {e}")
+        return lines
+
+    # Unprivileged ICMP isn't allowed here, so fall back to the system ping
+    try:
+        result = subprocess.run(_PING_CMD + [camera_ip], capture_output=True, text=True)
+
         if result.returncode == 0:
-            print("   ✓ Ping successful")
+            lines.append("   ✓ Ping successful")
         else:
-            print("   ✗ Ping failed")
-            print(f"   Output: {result.stdout}")
+            lines.append("   ✗ Ping failed")
+            lines.append(f"   Output: {result.stdout}")
     except Exception as e:
-        print(f"   ✗ Ping error: {e}")
-    
-    # Test 2: Port connectivity
-    print("\n2. Testing port connectivity...")
+        lines.append(f"   ✗ Ping error: {e}")
+    return lines
+
+def _port_check(camera_ip) -> Tuple[List[str], Optional[float]]:
+    """Test 2: port connectivity. Returns the report lines and the connect time, or None if closed."""
+    lines = ["\n2. Testing port connectivity..."]
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
-        result = sock.connect_ex((camera_ip, 80))
-        sock.close()
-        
-        if result == 0:
-            print("   ✓ Port 80 is open")
-        else:
-            print(f"   ✗ Port 80 is closed (error code: {result})")
-    except Exception as e:
-        print(f"   ✗ Port test error: {e}")
-    
-    # Test 3: HTTP request from this machine
-    print("\n3. Testing HTTP request from this machine...")
+        latency = _tcp_probe(camera_ip, 80)
+        lines.append(f"   ✓ Port 80 is open ({latency * 1000:.1f} ms to connect)")
+        return lines, latency
+    except OSError as e:
+        lines.append(f"   ✗ Port 80 is closed ({e})")
+        return lines, None
+
+async def _http_check_async(client: httpx.AsyncClient, camera_url: str) -> List[str]:
+    """Test 3 for one camera over a shared async client. Returns the report lines."""
+    lines = ["\n3. Testing HTTP request from this machine..."]
     try:
-        response = requests.get(camera_url, timeout=5)
-        print(f"   Status: {response.status_code}")
-        print(f"   Content-Type: {response.headers.get('content-type', 'Unknown')}")
-        print(f"   Content-Length: {len(response.content)} bytes")
-        
+        # Count the frame's bytes as they arrive rather than buffering the whole JPEG
+        async with client.stream("GET", camera_url) as response:
+            content_length = 0
+            async for chunk in response.aiter_bytes(16384):
+                content_length += len(chunk)
+        lines.append(f"   Status: {response.status_code}")
+        lines.append(f"   Content-Type: {response.headers.get('content-type', 'Unknown')}")
+        lines.append(f"   Content-Length: {content_length} bytes")
+
         if response.status_code == 200:
-            print("   ✓ HTTP request successful")
+            lines.append("   ✓ HTTP request successful")
         else:
-            print(f"   ✗ HTTP request failed: {response.status_code}")
-    except requests.exceptions.Timeout:
-        print("   ✗ HTTP request timed out")
-    except requests.exceptions.ConnectionError:
-        print("   ✗ HTTP connection failed")
+            lines.append(f"   ✗ HTTP request failed: {response.status_code}")
+    except httpx.TimeoutException:
+        lines.append("   ✗ HTTP request timed out")
+    except httpx.NetworkError:
+        lines.append("   ✗ HTTP connection failed")
     except Exception as e:
-        print(f"   ✗ HTTP request error: {e}")
-    
-    # Test 4: Network interface info
-    print("\n4. Network interface information...")
+        lines.append(f"   ✗ HTTP request error: {e}")
+    return lines
+
+async def _http_checks(camera_urls: List[str], timeout: httpx.Timeout = HTTP_TIMEOUT) -> List[List[str]]:
+    """Run test 3 against several cameras at once from a single thread."""
+    limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        return await asyncio.gather(*(_http_check_async(client, url) for url in camera_urls))
+
+def _http_check(camera_url, timeout: httpx.Timeout = HTTP_TIMEOUT):
+    """Test 3: HTTP request from this machine. Returns the report lines."""
+    return asyncio.run(_http_checks([camera_url], timeout))[0]
+
+def _port_then_http(camera_ip, camera_url):
+    """
+    Tests 2 and 3 in sequence, so the HTTP check can use what the port probe measured.
+
+    A closed port skips the HTTP request outright, and an open one bounds the
+    HTTP connect by a few times the measured connect time. The read timeout is
+    left alone, since the camera needs time to capture a frame whatever the RTT.
+
+    Returns:
+        List[str]: The report lines of both tests
+    """
+    port_lines, latency = _port_check(camera_ip)
+    if latency is None:
+        return port_lines + ["\n3. Testing HTTP request from this machine...",
+                             "   ✗ HTTP request skipped (port 80 is closed)"]
+    timeout = httpx.Timeout(HTTP_TIMEOUT.read, connect=min(CONNECT_TIMEOUT, 10 * latency + 0.1))
+    return port_lines + _http_check(camera_url, timeout)
+
+def _ipv4_interfaces() -> List[Tuple[str, str, str]]:
+    """
+    List IPv4 interfaces straight from the kernel (Linux only), without running ifconfig.
+
+    Returns:
+        List[Tuple[str, str, str]]: (interface name, address, netmask) for every
+            interface that has an IPv4 address
+    """
+    interfaces = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, name in socket.if_nameindex():
+            request = struct.pack("256s", name[:15].encode())
+            try:
+                address = fcntl.ioctl(sock.fileno(), _SIOCGIFADDR, request)
+                netmask = fcntl.ioctl(sock.fileno(), _SIOCGIFNETMASK, request)
+            except OSError:
+                continue  # No IPv4 address on this interface
+            # The sockaddr_in inside struct ifreq holds the address at bytes 20-24
+            interfaces.append((name, socket.inet_ntoa(address[20:24]), socket.inet_ntoa(netmask[20:24])))
+    return interfaces
+
+@functools.lru_cache(maxsize=None)
+def _iface_line_re(camera_ip: str) -> "re.Pattern":
+    """Whole lines mentioning the camera's first octet or a 192.168 address, compiled once per IP."""
+    first_octet = re.escape(camera_ip.split('.')[0])
+    return re.compile(rf"^.*(?:{first_octet}|192\.168).*$", re.MULTILINE)
+
+def _iface_info(camera_ip):
+    """Test 4: network interface info. Returns the report lines."""
+    lines = ["\n4. Network interface information..."]
+    if _IS_LINUX and fcntl is not None:
+        try:
+            interfaces = _ipv4_interfaces()
+        except OSError as e:
+            lines.append(f"   Error getting network info: {e}")
+            return lines
+        lines.append("   Network interfaces:")
+        first_octet = camera_ip.split('.')[0]
+        for name, address, netmask in interfaces:
+            if address.split('.')[0] == first_octet or address.startswith("192.168."):
+                lines.append(f"     {name}: {address}/{netmask}")
+        return lines
+
     try:
-        if platform.system() == "Windows":
-            result = subprocess.run(["ipconfig"], capture_output=True, text=True)
-        else:
-            result = subprocess.run(["ifconfig"], capture_output=True, text=True)
-        
-        print("   Network interfaces:")
-        for line in result.stdout.split('\n'):
-            if camera_ip.split('.')[0] in line or "192.168" in line:
-                print(f"     {line.strip()}")
+        result = subprocess.run(_IFACE_CMD, capture_output=True, text=True)
+
+        lines.append("   Network interfaces:")
+        # One scan over the whole output instead of two substring checks per line
+        for match in _iface_line_re(camera_ip).finditer(result.stdout):
+            lines.append(f"     {match.group(0).strip()}")
     except Exception as e:
-        print(f"   Error getting network info: {e}")
-    
-    print("\n=== Troubleshooting Tips ===")
-    print("If the camera is not accessible:")
-    print("1. Ensure ESP32 and mobile device are on the same WiFi network")
-    print("2. Check if ESP32 is powered on and connected")
-    print("3. Verify the camera IP address is correct")
-    print("4. Try accessing http://192.168.0.179/capture in a browser")
-    print("5. Check ESP32 serial monitor for any error messages")
+        lines.append(f"   Error getting network info: {e}")
+    return lines
+
+TROUBLESHOOTING_TIPS = f"""
+=== Troubleshooting Tips ===
+If the camera is not accessible:
+1. Ensure ESP32 and mobile device are on the same WiFi network
+2. Check if ESP32 is powered on and connected
+3. Verify the camera IP address is correct
+4. Try accessing {CAMERA_URL} in a browser
+5. Check ESP32 serial monitor for any error messages
+"""
+
+def test_camera_connectivity():
+    """Test camera connectivity from different perspectives"""
+    try:
+        camera_ip = _camera_address()
+    except OSError as e:
+        print(f"Could not resolve camera address {CAMERA_IP}: {e}")
+        return
+
+    # Header now, so there is something on screen while the checks run
+    print("=== Network Connectivity Test ===\n", flush=True)
+
+    # The checks mostly wait on the network or a subprocess, so run them at
+    # once: an unreachable camera costs one timeout, not one per check. The
+    # reports are collected in test order and written out together once all
+    # are done.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(_ping, camera_ip),
+            # The HTTP check waits on the port probe and tunes itself from it
+            executor.submit(_port_then_http, camera_ip, CAMERA_URL),
+            executor.submit(_iface_info, camera_ip),
+        ]
+        report = [line for future in futures for line in future.result()]
+
+    sys.stdout.write("\n".join(report) + "\n" + TROUBLESHOOTING_TIPS)
+    sys.stdout.flush()
 
 if __name__ == "__main__":
-    test_camera_connectivity() 
\ No newline at end of file
+    test_camera_connectivity()